@@ -86,6 +86,19 @@ class DateCalc:
 
         return value
 
+    @classmethod
+    def days_since(cls, time1, year):
+        """Days from the 1st of January of year to the date in time1,
+           this does not use YEARDAY as not all sources set it."""
+        days = time1[MDAY] - 1
+        for mon in range(1, time1[MONTH]):
+            days += cls.days_in_month(mon, time1[YEAR])
+        for yyyy in range(year, time1[YEAR]):
+            days += cls.days_in_year(yyyy)
+        for yyyy in range(time1[YEAR], year):
+            days -= cls.days_in_year(yyyy)
+        return days
+
     @classmethod
     def days_in_month(cls, mon, yyyy):
         m_idx = mon - 1
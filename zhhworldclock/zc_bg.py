@@ -5,30 +5,79 @@
 
 import math
 
+from datecalc import DateCalc
+from zc_utils import YEAR, MONTH, MDAY, HOUR, MINUTE, SECOND
+
 _M_CONV = 64.0
 _Z_CONV = 255.49
 
+### The brightness lookup tables are indexed by normalised values
+### multiplied by LUT_ONE, values up to (almost) 2.0 are allowed as
+### some backgrounds go over 1.0 and rely on the capping
+LUT_ONE = 128
+LUT_SIZE = 256
+
+### Below dither_below the ZIP LED values are multiplied by 2**z_shift
+### to keep the fractional part for the compositor's temporal dithering,
+### the gain is chosen to keep values up to about 1.4 within 255
+_Z_SHIFT_MAX = 4
+_Z_GAIN_LIMIT = 0.5
+
+### Common epoch for phase locked animations, only the year is needed
+PHASE_EPOCH_YEAR = 2000
+
 class HaloBackground:
     MICROBIT_CHANGED = 0x01
     HALO_CHANGED = 0x02
 
+    ### Target frame rate for render(), 0 means only on each new second
+    FRAME_RATE = 25
+    ### Number of quality levels, the quality attribute is set by
+    ### zc_governor from 0 (best) to QUALITY_LEVELS - 1
+    QUALITY_LEVELS = 1
+    ### Interval in milliseconds for keyframes which are interpolated between
+    ### by zc_keyframe on the other frames, 0 renders every frame
+    KEYFRAME_MS = 0
+    ### Brightness below which ZIP LED values have extra precision for
+    ### dithering, this is set once at startup for all backgrounds
+    dither_below = 0.0
+    ### Set to True to make run_time() with a period give the same phase
+    ### on every clock with the same UTC time rather than starting from
+    ### start(), this is set once at startup for all backgrounds
+    phase_locked = False
 
     def __init__(self, zip_, mdisplaylist, brightness=1, options=None):
+        ### zip_ is a zc_compositor.Layer which acts like a NeoPixel object
         self._zip = zip_
         self._mdisplaylist = mdisplaylist
         self._last_render_tms = None
         self._options = options if options is not None else {}
 
         self._brightness = None
+        self._z_brightness = None
+        self.z_shift = 0
+        ### z_lut[int(value * LUT_ONE)] is z_bri_norm(value, self.brightness)
+        ### and m_lut is the same for m_bri_norm()
+        self.z_lut = bytearray(LUT_SIZE)
+        self.m_lut = bytearray(LUT_SIZE)
         self.displayed = 0  ### bit mask of localtime fields shown by background
+        self.quality = 0
 
         ### list of values, e.g. 9 for micro:bit display, [20, 20, 20] for ZIP LED
         self._palette = []
         self._palette_bri = []  ### brightness adjusted values
 
-        ##self._start_time_lt = None
-        ##self._start_time_ms = None
-        ##self._start_time_tms = None
+        self._start_time_lt = None
+        self._start_time_ms = None
+        self._start_time_tms = None
+        self._start_s = 0
+        ### UTC time of the frame, set by the caller before render()
+        ### when phase_locked is True
+        self.utc_time = None
+        ### Days to the date in _days_date from the year in _days_date[0]
+        self._days_date = [0, 0, 0]
+        self._days_year = None
+        self._days = 0
 
         self.brightness = brightness  ### This can be modified later
 
@@ -61,27 +110,57 @@ class HaloBackground:
         ### This should return MICROBIT_CHANGED | HALO_CHANGED
         raise NotImplementedError
 
+    def frame_ms(self, local_time, milliseconds):
+        """Time in milliseconds until this background next needs to be rendered."""
+        if self.FRAME_RATE:
+            return 1000 // self.FRAME_RATE
+        return 1000 - milliseconds
+
     def start(self, local_time, milliseconds, ticks_ms):
-        ### pylint: disable=attribute-defined-outside-init
         self._start_time_lt = local_time
         self._start_time_ms = milliseconds
         self._start_time_tms = ticks_ms
+        self._start_s = self._seconds(local_time, local_time[YEAR])
 
     def stop(self):
         self._last_render_tms = None
 
-    def run_time(self, local_time, milliseconds):
-        ### TODO complete this for years
-        return ((local_time[7] - self._start_time_lt[7]) * 86400
-                 + (local_time[3] - self._start_time_lt[3]) * 3600
-                 + (local_time[4] - self._start_time_lt[4]) * 60
-                 + local_time[5] - self._start_time_lt[5] + milliseconds / 1000.0)
+    def _seconds(self, time1, year):
+        ### The day count only changes at midnight so is cached
+        days_date = self._days_date
+        if (time1[MDAY] != days_date[2] or time1[MONTH] != days_date[1]
+                or time1[YEAR] != days_date[0] or year != self._days_year):
+            self._days = DateCalc.days_since(time1, year)
+            days_date[0] = time1[YEAR]
+            days_date[1] = time1[MONTH]
+            days_date[2] = time1[MDAY]
+            self._days_year = year
+        return self._days * 86400 + time1[HOUR] * 3600 + time1[MINUTE] * 60 + time1[SECOND]
+
+    def run_time(self, local_time, milliseconds, period_ms=0):
+        """Seconds since start() or with period_ms the seconds into the
+           current period, the latter is from PHASE_EPOCH_YEAR in UTC
+           if phase_locked so is the same on all synchronised clocks."""
+        if period_ms and self.phase_locked and self.utc_time is not None:
+            ### Integer arithmetic keeps millisecond precision which
+            ### single precision floats lose for times from the epoch
+            secs = self._seconds(self.utc_time, PHASE_EPOCH_YEAR)
+            return ((secs % period_ms) * 1000 + milliseconds) % period_ms / 1000.0
+
+        secs = self._seconds(local_time, self._start_time_lt[YEAR]) - self._start_s
+        if period_ms:
+            return (secs % period_ms * 1000 + milliseconds) % period_ms / 1000.0
+        return secs + milliseconds / 1000.0
+
+    @property
+    def layer(self):
+        return self._zip
 
     def palette_add(self, value):
         last_idx = len(self._palette)
         self._palette.append(value)
         try:
-            self._palette_bri.append([self.z_bri_norm(v, self._brightness) for v in value])
+            self._palette_bri.append([self.z_bri_norm(v, self._z_brightness) for v in value])
         except TypeError:
             self._palette_bri.append(self.m_bri_norm(value, self._brightness))
         return last_idx
@@ -97,10 +176,19 @@ class HaloBackground:
     def brightness(self, value):
         if self._brightness != value:
             self._brightness = value
+            z_shift = 0
+            if value < self.dither_below:
+                while z_shift < _Z_SHIFT_MAX and value * (2 << z_shift) <= _Z_GAIN_LIMIT:
+                    z_shift += 1
+            self.z_shift = z_shift
+            self._z_brightness = value * (1 << z_shift)
+            for idx in range(LUT_SIZE):
+                self.z_lut[idx] = self.z_bri_norm(idx / LUT_ONE, self._z_brightness)
+                self.m_lut[idx] = self.m_bri_norm(idx / LUT_ONE, value)
             for idx in range(len(self._palette)):
                 ### Use inplace updates to avoid creating new lists
                 try:
                     for c_idx in range(len(self._palette[idx])):
-                        self._palette_bri[idx][c_idx] = self.z_bri_norm(self._palette[idx][c_idx], self._brightness)
+                        self._palette_bri[idx][c_idx] = self.z_bri_norm(self._palette[idx][c_idx], self._z_brightness)
                 except TypeError:
                     self._palette_bri[idx] = self.m_bri_norm(self._palette[idx], self._brightness)
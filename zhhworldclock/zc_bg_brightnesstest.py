@@ -7,6 +7,8 @@ from zc_bg import HaloBackground
 
 
 class BrightnessTest(HaloBackground):
+    FRAME_RATE = 0
+
     def render(self, local_time, milliseconds, ticks_ms):
         for idx in range(min(len(self._zip), 255 + 1)):
             self._zip[idx] = (idx, 0, 0)
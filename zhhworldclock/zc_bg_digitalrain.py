@@ -7,24 +7,39 @@ import random
 
 import utime
 
-from zc_bg import HaloBackground
-from zc_utils import M_LED_POS, M_LED_SPACING, Z_LED_POS, Z_LED_SPACING, get_m_pixels_through_x, get_z_pixels_through_x, vertical_line_near_pixel
+from zc_bg import HaloBackground, LUT_ONE, LUT_SIZE
+from zc_compositor import RED
+from zc_spatial import LED_INDEX, MATRIX_BASE, Q_SHIFT, Q_ONE, to_q
 
 
 _DP_X = 0
 _DP_Y = 1
 _DP_SPEED = 2
 _DP_TRAIL_LENGTH = 3
-_DP_HEAD_BRI = 4
+_DP_HEAD_BRI = 4  ### 0 to 255 with 0 for no drop
+
+### Positions and lengths are fixed point from zc_spatial, speed is per second
+_IL_RADIUS_Q = to_q(0.08)
+_BOTTOM_Q = to_q(1.1)
+
+### Quality levels are fewer drops, no micro:bit display and half frame rate
+_QUALITY_DROPS = (12, 6, 6, 6)
+_QUALITY_NO_MATRIX = 2
+_QUALITY_HALF_RATE = 3
 
 
 class DigitalRain(HaloBackground):
+    FRAME_RATE = 30
+    QUALITY_LEVELS = len(_QUALITY_DROPS)
+
     def __init__(self, zip_, mdisplaylist, brightness=1, options=None):
         super().__init__(zip_, mdisplaylist, brightness, options)
 
-        self._max_drops = 12
+        self._max_drops = _QUALITY_DROPS[0]
         ### This is a flattened list of [x, y, speed, trail_length, head_bri]
-        self._rain_drops = array.array('f', [0.0] * (5 * self._max_drops))
+        self._rain_drops = array.array('i', [0] * (5 * self._max_drops))
+
+        self._near = LED_INDEX.buffer()
 
         self._last_run_tms = utime.ticks_ms()
 
@@ -38,71 +53,89 @@ class DigitalRain(HaloBackground):
         return round(count_per_s * duration_s)
 
 
-    def _removeadddrops(self, dur_s):
+    def _removeadddrops(self, dur_ms):
+        ### Drops fall off the display in a few seconds so there's no
+        ### need to move them further than that after a pause
+        dur_ms = min(dur_ms, 10_000)
+        rain_drops = self._rain_drops
         for drop_no in range(self._max_drops):
             base_idx = drop_no * 5
-            if self._rain_drops[base_idx + _DP_HEAD_BRI] == 0.0:
+            if rain_drops[base_idx + _DP_HEAD_BRI] == 0:
                 continue
-            self._rain_drops[base_idx + _DP_Y] += self._rain_drops[base_idx + _DP_SPEED] * dur_s
-            if self._rain_drops[base_idx + _DP_Y] - self._rain_drops[base_idx + _DP_TRAIL_LENGTH] > 1.1:
-                self._rain_drops[base_idx + _DP_HEAD_BRI] = 0.0
+            rain_drops[base_idx + _DP_Y] += rain_drops[base_idx + _DP_SPEED] * dur_ms // 1000
+            if rain_drops[base_idx + _DP_Y] - rain_drops[base_idx + _DP_TRAIL_LENGTH] > _BOTTOM_Q:
+                rain_drops[base_idx + _DP_HEAD_BRI] = 0
 
         ### add new drops based on probability and time elasped since last addition
-        new_drop_count = self._raindrops_prob(dur_s)
+        ### existing drops beyond the quality limit are left to fall off the display
+        new_drop_count = self._raindrops_prob(dur_ms / 1000.0)
         drops_added = 0
-        for drop_no in range(self._max_drops):
+        for drop_no in range(_QUALITY_DROPS[self.quality]):
             base_idx = drop_no * 5
-            if self._rain_drops[base_idx + _DP_HEAD_BRI] != 0.0:
+            if rain_drops[base_idx + _DP_HEAD_BRI] != 0:
                 continue
 
-            self._rain_drops[base_idx + _DP_X] = random.uniform(-1.05, 1.05)
-            self._rain_drops[base_idx + _DP_Y] = random.uniform(-1, -1.1)
-            self._rain_drops[base_idx + _DP_SPEED] = random.uniform(0.2, 0.6) if random.random() < 0.9 else random.uniform(0.1, 1.5)
-            self._rain_drops[base_idx + _DP_TRAIL_LENGTH] = random.uniform(0.3, 1.5) * 0.5 + random.uniform(0.7, 1.0) * 0.5
-            self._rain_drops[base_idx + _DP_HEAD_BRI] = random.uniform(0.3, 1.0)   ### was random.randint(60, 255)
+            rain_drops[base_idx + _DP_X] = to_q(random.uniform(-1.05, 1.05))
+            rain_drops[base_idx + _DP_Y] = to_q(random.uniform(-1, -1.1))
+            rain_drops[base_idx + _DP_SPEED] = to_q(random.uniform(0.2, 0.6) if random.random() < 0.9 else random.uniform(0.1, 1.5))
+            rain_drops[base_idx + _DP_TRAIL_LENGTH] = to_q(random.uniform(0.3, 1.5) * 0.5 + random.uniform(0.7, 1.0) * 0.5)
+            rain_drops[base_idx + _DP_HEAD_BRI] = random.randint(77, 255)   ### was random.uniform(0.3, 1.0)
             drops_added += 1
             if drops_added >= new_drop_count:
                 break
 
+    def frame_ms(self, local_time, milliseconds):
+        if self.quality >= _QUALITY_HALF_RATE:
+            return 2000 // self.FRAME_RATE
+        return super().frame_ms(local_time, milliseconds)
+
     def render(self, local_time, milliseconds, ticks_ms):
         ### pylint: disable=too-many-locals
         ### move existing drops and remove any drops that have fallen
         ### off the display by setting brightness to zero
-        delta_s = utime.ticks_diff(ticks_ms, self._last_run_tms) / 1e3
-        self._removeadddrops(delta_s)
+        self._removeadddrops(utime.ticks_diff(ticks_ms, self._last_run_tms))
 
         ### Render rain drops
         ### Use a max() strategy to combine "droplets" on LEDs
         ### Brightness values calculated in subsequent code can exceed 1.0
-        ### [zm]_bri_norm will cap values
-        il_radius = 0.08
-        gbri = self.brightness
+        ### the lookup tables will cap values
+        ### All the arithmetic is fixed point with brightness in Q_ONE units
+        m_lut = self.m_lut
+        near = self._near
+        spacing_q = LED_INDEX.spacing_q
+        rain_drops = self._rain_drops
+        with_matrix = self.quality < _QUALITY_NO_MATRIX
         for drop_no in range(self._max_drops):
-            x, y, speed, trail_length, head_bri = self._rain_drops[drop_no * 5:(drop_no * 5 + 5)]
-            if head_bri == 0.0:
+            base_idx = drop_no * 5
+            head_bri = rain_drops[base_idx + _DP_HEAD_BRI]
+            if head_bri == 0:
                 continue  ### not a rain drop
-
-            for p_idx in get_z_pixels_through_x(x):
-                distances = vertical_line_near_pixel(Z_LED_SPACING, x, y, y - trail_length,
-                                                     Z_LED_POS[p_idx * 2], Z_LED_POS[p_idx * 2 + 1])
-                if distances:
-                    trail_bri = distances[1] * distances[1] * 0.75 + 0.25
-                    brightness = (trail_bri * head_bri
-                                  * max(0, (il_radius - distances[0])) / il_radius)
-                    if brightness > 0.0:
-                        self._zip[p_idx] = (max(self.m_bri_norm(brightness * 1.25 + 2, gbri),
-                                                self._zip[p_idx][0]), 0, 0)
-
-            for m_idx in get_m_pixels_through_x(x):
-                distances = vertical_line_near_pixel(M_LED_SPACING, x, y, y - trail_length,
-                                                     M_LED_POS[m_idx * 2], M_LED_POS[m_idx * 2 + 1])
-                if distances:
-                    trail_bri = distances[1] * distances[1] * 0.75 + 0.25
-                    brightness = (trail_bri * head_bri
-                                  * max(0, (il_radius - distances[0])) / il_radius)
-                    if brightness > 0.0:
-                        self._mdisplaylist[m_idx] = max(self.m_bri_norm(brightness * 1.6, gbri),
-                                                        self._mdisplaylist[m_idx])
+            x = rain_drops[base_idx + _DP_X]
+            y = rain_drops[base_idx + _DP_Y]
+            y_top = y - rain_drops[base_idx + _DP_TRAIL_LENGTH]
+
+            for n_idx in range(LED_INDEX.x_band_q(x, near, with_matrix)):
+                idx = near[n_idx]
+                distance = LED_INDEX.vline_q(idx, spacing_q[idx], x, y, y_top)
+                if distance < 0 or distance >= _IL_RADIUS_Q:
+                    continue
+                relint = LED_INDEX.relint_q
+                trail_bri = (relint * relint >> Q_SHIFT) * 3 // 4 + Q_ONE // 4
+                brightness = (trail_bri * head_bri >> 8) * (_IL_RADIUS_Q - distance) // _IL_RADIUS_Q
+                if brightness <= 0:
+                    continue
+                if idx < MATRIX_BASE:
+                    ### This is m_bri_norm(brightness * 1.25 + 2) using the linearity
+                    ### of m_bri_norm() to keep the value within the lookup table
+                    self._zip.max(idx, RED,
+                                  min(9, 2 * m_lut[min(LUT_SIZE - 1,
+                                                       LUT_ONE + (brightness * 5 * LUT_ONE >> (Q_SHIFT + 3)))])
+                                  << self.z_shift)
+                else:
+                    m_idx = idx - MATRIX_BASE
+                    self._mdisplaylist[m_idx] = max(m_lut[min(LUT_SIZE - 1,
+                                                              brightness * 8 * LUT_ONE // 5 >> Q_SHIFT)],
+                                                    self._mdisplaylist[m_idx])
 
         self._last_run_tms = ticks_ms
         ### TODO could count the changes
@@ -111,4 +144,4 @@ class DigitalRain(HaloBackground):
     def stop(self):
         ### "Remove" all the rain drops by setting brightness to zero
         for drop_no in range(self._max_drops):
-            self._rain_drops[drop_no * 5 + _DP_HEAD_BRI] = 0.0
+            self._rain_drops[drop_no * 5 + _DP_HEAD_BRI] = 0
@@ -5,27 +5,38 @@
 
 from rainbow import wavelengthToRGBtuple
 
-from zc_bg import HaloBackground
-from zc_utils import Z_LED_POS
+from zc_bg import HaloBackground, LUT_ONE
+from zc_layout import layout
+
+
+### 0.80 brightness, sqrt as lookup is for value squared
+_RGB_SCALE = 0.8944 * LUT_ONE
 
 
 class FallingRainbow(HaloBackground):
-    def render(self, local_time, milliseconds, ticks_ms):
-        secs = self.run_time(local_time, milliseconds)
+    FRAME_RATE = 20
+    KEYFRAME_MS = 200
 
-        ### Use symmetry of circular LED layout to set other side using same value
-        cbri = 0.80 * self.brightness
-        for idx in range(len(self._zip) // 2 + 1):
-            wavelength_nm = 380.0 + (Z_LED_POS[idx * 2 + 1] + 1.0) * 150 - (secs % 60 - 30) * (380/30)
+    def render(self, local_time, milliseconds, ticks_ms):
+        secs = self.run_time(local_time, milliseconds, 60_000)
+
+        ### Use symmetry of the LED layout to set other side using same value
+        z_lut = self.z_lut
+        led_layout = layout()
+        pos = led_layout.pos
+        pairs = led_layout.x_pairs
+        for p_idx in range(0, len(pairs), 2):
+            idx = pairs[p_idx]
+            wavelength_nm = 380.0 + (pos[idx * 2 + 1] + 1.0) * 150 - (secs - 30) * (380/30)
             r, g, b = wavelengthToRGBtuple(wavelength_nm)
             if wavelength_nm < 405.0:
                 b = min(b, r)  ### blue seems too high here, cap to red level
 
-            rgb_col = (self.z_bri_norm(r, cbri),
-                       self.z_bri_norm(g, cbri),
-                       self.z_bri_norm(b, cbri))
+            rgb_col = (z_lut[int(r * _RGB_SCALE)],
+                       z_lut[int(g * _RGB_SCALE)],
+                       z_lut[int(b * _RGB_SCALE)])
             self._zip[idx] = rgb_col
-            if idx != 0:
-                self._zip[len(self._zip) - idx] = rgb_col
+            if pairs[p_idx + 1] != idx:
+                self._zip[pairs[p_idx + 1]] = rgb_col
 
         return self.HALO_CHANGED
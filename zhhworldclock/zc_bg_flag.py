@@ -4,11 +4,14 @@
 
 import math
 
-from zc_bg import HaloBackground
-from zc_utils import HOUR, SECOND, M_LED_POS, Z_LED_POS
+from zc_bg import HaloBackground, LUT_ONE
+from zc_layout import layout
+from zc_utils import HOUR, SECOND
 
 
 class Flag(HaloBackground):
+    KEYFRAME_MS = 160
+
     ### 0 black, 1 red, 2 green, 3 white
     WELSH_FLAG_60 = tuple((3,) * 8 + (1,) * 3 + (3,1,3,1,3,1,2,1,1,2,2,2,1,1)
                           + (2,) * 11 + (1,2,1,1,2,1,1,1,2,2) + (3,) * 3
@@ -66,18 +69,17 @@ class Flag(HaloBackground):
             except AttributeError:
                 pass
 
-    def _flag_h2(self, top_col, bottom_col):
-        quarter = len(self._zip) // 4
-
-        colour = top_col
-        for idx in range(0, quarter + 1):
-            self._zip[idx] = colour
-        for idx in range(quarter * 3, len(self._zip)):
-            self._zip[idx] = colour
+        ### 1 for the ring LEDs in the top half including those level with the centre
+        led_layout = layout()
+        self._top = bytearray(led_layout.ring_count)
+        for idx in range(led_layout.ring_count):
+            frac = led_layout.ring_frac(idx)
+            self._top[idx] = 1 if frac <= 0.25 or frac >= 0.75 else 0
 
-        colour = bottom_col
-        for idx in range(quarter + 1, quarter * 3):
-            self._zip[idx] = colour
+    def _flag_h2(self, top_col, bottom_col):
+        top = self._top
+        for idx in range(len(top)):
+            self._zip[idx] = top_col if top[idx] else bottom_col
 
     def flag_ukraine(self):
         bidx = self._pal_bidx["ukraine"]
@@ -91,13 +93,15 @@ class Flag(HaloBackground):
 
     def flag_wales(self):
         bidx = self._pal_bidx["wales"]
-        for idx in range(len(self._zip)):
-            c_idx = self.WELSH_FLAG_60[idx * len(self.WELSH_FLAG_60)
-                                       // len(self._zip)]
-            self._zip[idx] = self.palette(bidx + c_idx)
+        flag_len = len(self.WELSH_FLAG_60)
+        for first, count, _, start_angle in layout().rings:
+            start_off = round(start_angle / (2 * math.pi) * flag_len)
+            for r_idx in range(count):
+                c_idx = self.WELSH_FLAG_60[(r_idx * flag_len // count + start_off) % flag_len]
+                self._zip[first + r_idx] = self.palette(bidx + c_idx)
 
         ### Off substitues for white on two pixels top left
-        m_bri_TOCALC = self.m_bri_norm(1.0, self.brightness)
+        m_bri_TOCALC = self.m_lut[LUT_ONE]
         for idx in range(len(self._mdisplaylist)):
             self._mdisplaylist[idx] = 0 if idx in (0, 5) else m_bri_TOCALC
 
@@ -118,38 +122,41 @@ class Flag(HaloBackground):
     def _wind_ripple(self, ripple_time, total, changes_):
         ### pylint: disable=too-many-locals
         shift_x = 4.0 * ripple_time / total - 2.0
+        led_layout = layout()
+        pos = led_layout.pos
 
         if changes_ & self.HALO_CHANGED:
             ### Modulate the values on the Halo taking advantage of symmetry
-            half_len = len(self._zip) // 2
-            for idx in range(len(self._zip) // 4, len(self._zip) * 3 // 4 + 1):
-                led_x = Z_LED_POS[idx * 2]
+            pairs = led_layout.y_pairs
+            for p_idx in range(0, len(pairs), 2):
+                idx = pairs[p_idx]
+                led_x = pos[idx * 2]
                 moving_x = 0 - led_x + shift_x
                 col_p1 = self._wind_ripple_mod(moving_x) / 1.9 + 1.0
-                r, g, b = self._zip[idx]
-                self._zip[idx] = (min(255, max(0, round(r * col_p1))),
-                                  min(255, max(0, round(g * col_p1))),
-                                  min(255, max(0, round(b * col_p1))))
-                tophalf_idx = (half_len - idx) % len(self._zip)
-                if idx != tophalf_idx:
-                    r, g, b = self._zip[tophalf_idx]
-                    self._zip[tophalf_idx] = (min(255, max(0, round(r * col_p1))),
-                                              min(255, max(0, round(g * col_p1))),
-                                              min(255, max(0, round(b * col_p1))))
+                self._zip.scale(idx, col_p1)
+                if pairs[p_idx + 1] != idx:
+                    self._zip.scale(pairs[p_idx + 1], col_p1)
 
         if changes_ & self.MICROBIT_CHANGED:
             ### Modulate micro:bit display using values calculated per column
-            for m_idx in range(0, 5):
-                led_x = M_LED_POS[m_idx * 2]
+            first, columns, rows = led_layout.matrices[0]
+            for m_idx in range(0, columns):
+                led_x = pos[(first + m_idx) * 2]
                 moving_x = 0 - led_x + shift_x
                 col_p1 = self._wind_ripple_mod(moving_x) / 1.9 + 1.0
-                for y_off in range(0, 25, 5):
+                for y_off in range(0, columns * rows, columns):
                     self._mdisplaylist[m_idx + y_off] = min(9,
                                                             max(0,
                                                             round(self._mdisplaylist[m_idx + y_off]
                                                                   * col_p1)))
 
 
+    def frame_ms(self, local_time, milliseconds):
+        ### Only the wind ripple at the start of each minute is animated
+        if local_time[SECOND] <= 7:
+            return super().frame_ms(local_time, milliseconds)
+        return 1000 - milliseconds
+
     def render(self, local_time, milliseconds, ticks_ms):
         changes = self._flags[local_time[HOUR] % len(self._flags)]()
         if 0 <= local_time[SECOND] <= 7:
@@ -7,5 +7,7 @@ from zc_bg import HaloBackground
 
 
 class HourGlass(HaloBackground):
+    FRAME_RATE = 0
+
     def render(self, local_time, milliseconds, ticks_ms):
         pass ### TODO
@@ -3,45 +3,60 @@
 ### SPDX-License-Identifier: MIT
 
 
-from zc_bg import HaloBackground
-from zc_utils import M_LED_POS, Z_LED_POS, get_m_pixels_through_x, get_z_pixels_through_x
+from zc_bg import HaloBackground, LUT_ONE, LUT_SIZE
+from zc_compositor import RED
+from zc_spatial import LED_INDEX, MATRIX_BASE, Q_SHIFT, to_q
+
+
+_IL_RADIUS_Q = to_q(0.08)
+_TRAIL_STEP_Q = to_q(0.075)
+### Each trailing light is half the brightness of the one in front,
+### the ZIP LED brightness lookup is for value squared hence the sqrt(0.5),
+### these multiply a fixed point distance to give a lookup table index
+_Z_SCALES = tuple(round(1.15 * LUT_ONE / 0.08 * 0.7071 ** n) for n in range(3))
+_M_SCALES = tuple(round(1.5 * LUT_ONE / 0.08 * 0.5 ** n) for n in range(3))
 
 
 class LarsonScanner(HaloBackground):
+    FRAME_RATE = 40
+
+    def __init__(self, zip_, mdisplaylist, brightness=1, options=None):
+        super().__init__(zip_, mdisplaylist, brightness, options)
+        self._near = LED_INDEX.buffer()
+
     def render(self, local_time, milliseconds, ticks_ms):
         ### pylint: disable=too-many-locals
-        ct_s = self.run_time(local_time, milliseconds) % 4
+        ct_s = self.run_time(local_time, milliseconds, 4000)
         direction = 1
         if ct_s >= 2.0:
             direction = -1
             ct_s -= 2.0
 
-        x1 = (ct_s / 0.90909 - 1.1)
-        if direction < 0:
-            x1 = 0.0 - x1
-        x2 = x1 - 0.075 * direction
-        x3 = x1 - 0.150 * direction
+        qx1 = to_q(ct_s / 0.90909 - 1.1) * direction
 
-        il_radius = 0.08
-        gbri = self.brightness
+        z_lut = self.z_lut
+        m_lut = self.m_lut
+        near = self._near
+        qpos = LED_INDEX.qpos
         ### Brightness values calculated in subsequent code can exceed 1.0
-        ### [zm]_bri_norm will cap values
-        for x in (x1, x2, x3):
-            for p_idx in get_z_pixels_through_x(x):
-                x_distance = abs(Z_LED_POS[p_idx * 2] - x)
-                brightness = (max(0, (il_radius - x_distance)) / il_radius) * 1.15
-                if brightness > 0.0:
+        ### the lookup tables will cap values
+        for trail_idx in range(len(_Z_SCALES)):
+            qx = qx1 - trail_idx * _TRAIL_STEP_Q * direction
+            z_scale = _Z_SCALES[trail_idx]
+            m_scale = _M_SCALES[trail_idx]
+            for n_idx in range(LED_INDEX.x_band_q(qx, near)):
+                idx = near[n_idx]
+                x_distance = abs(qpos[idx * 2] - qx)
+                if x_distance >= _IL_RADIUS_Q:
+                    continue
+                if idx < MATRIX_BASE:
                     ### Set red level on ZIP LEDs
-                    self._zip[p_idx] = (max(self.z_bri_norm(brightness, gbri),
-                                            self._zip[p_idx][0]),
-                                        0, 0)
-
-            for m_idx in get_m_pixels_through_x(x):
-                x_distance = abs(M_LED_POS[m_idx * 2] - x)
-                brightness = (max(0, (il_radius - x_distance)) / il_radius) * 1.5
-                if brightness > 0.0:
-                    self._mdisplaylist[m_idx] = max(self.m_bri_norm(brightness, gbri),
+                    self._zip.max(idx, RED,
+                                  z_lut[min(LUT_SIZE - 1, (_IL_RADIUS_Q - x_distance) * z_scale >> Q_SHIFT)])
+                else:
+                    m_idx = idx - MATRIX_BASE
+                    self._mdisplaylist[m_idx] = max(m_lut[min(LUT_SIZE - 1,
+                                                              (_IL_RADIUS_Q - x_distance) * m_scale >> Q_SHIFT)],
                                                     self._mdisplaylist[m_idx])
-            gbri /= 2.0
 
         return self.MICROBIT_CHANGED | self.HALO_CHANGED
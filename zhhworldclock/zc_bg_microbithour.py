@@ -9,6 +9,8 @@ from zc_utils import HOUR
 
 
 class MicrobitHour(HaloBackground):
+    FRAME_RATE = 0
+
     def render(self, local_time, milliseconds, ticks_ms):
         hh = local_time[HOUR]
         clock_hhand_img = getattr(Image, "CLOCK" + str(hh % 12))
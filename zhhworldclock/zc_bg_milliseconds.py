@@ -4,19 +4,33 @@
 
 
 from zc_bg import HaloBackground
+from zc_compositor import RED
+from zc_layout import layout
 
 
 ### This is mainly intended to aid analysis and debugging of synchronisation across multiple clocks
 class Milliseconds(HaloBackground):
+    FRAME_RATE = 50
+
+    def __init__(self, zip_, mdisplaylist, brightness=1, options=None):
+        super().__init__(zip_, mdisplaylist, brightness, options)
+
+        ### The ring LEDs in the bottom right quarter
+        led_layout = layout()
+        self._quarter = bytes(idx for idx in range(led_layout.ring_count)
+                              if 0.25 <= led_layout.ring_frac(idx) < 0.5)
+
     def render(self, local_time, milliseconds, ticks_ms):
         w_quarter = milliseconds % 500 // 125
-        r_idx = milliseconds * len(self._zip) // 1000
 
         ### Only light up on bottom right quarter
+        ### These fixed values need the same gain as the brightness adjusted ones
+        z_shift = self.z_shift
         if w_quarter % 4 == 1:
-            q_pix_cnt = len(self._zip) // 4
-            for idx in range(w_quarter * q_pix_cnt, (w_quarter + 1) * q_pix_cnt):
-                self._zip[idx] = (16, 10, 22)
-        self._zip[r_idx] = (self._zip[r_idx][0] + 32, self._zip[r_idx][1], self._zip[r_idx][2])
+            colour = (min(255, 16 << z_shift), min(255, 10 << z_shift), min(255, 22 << z_shift))
+            for idx in self._quarter:
+                self._zip[idx] = colour
+        for first, count, _, _ in layout().rings:
+            self._zip.add(first + milliseconds * count // 1000, RED, 32 << z_shift)
 
         return self.HALO_CHANGED
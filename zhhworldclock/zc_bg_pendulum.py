@@ -5,13 +5,22 @@
 
 import math
 
-from zc_bg import HaloBackground
-from zc_utils import get_pixels_near_angle
+from zc_bg import HaloBackground, LUT_ONE, LUT_SIZE
+from zc_compositor import RED
+from zc_spatial import LED_INDEX, AngleFalloff, FALLOFF_ONE
+
+
+### Radius of the bob on the ring
+_IL_RADIUS = 0.22
+### This is 0.65 brightness, sqrt as lookup is for value squared
+_LUT_SCALE = round(math.sqrt(0.65) * LUT_ONE)
 
 
 class Pendulum(HaloBackground):
-    def __init__(self, zip_, mdisplaylist, options=None):
-        super().__init__(zip_, mdisplaylist, options)
+    FRAME_RATE = 40
+
+    def __init__(self, zip_, mdisplaylist, brightness=1, options=None):
+        super().__init__(zip_, mdisplaylist, brightness, options)
 
         if self._options.get("length") is None:
             ### a pendulum just under one metre for 2s period
@@ -27,17 +36,24 @@ class Pendulum(HaloBackground):
 
         self._gravity = 9.81
         self._coef = math.sqrt(self._gravity / self._length)
+        ### Whole milliseconds for the period allows run_time() to keep the phase
+        self._period_ms = round(2 * math.pi / self._coef * 1000)
+        self._phase_scale = 2 * math.pi * 1000 / self._period_ms
+        self._falloff = AngleFalloff((_IL_RADIUS,))
+        self._near = LED_INDEX.buffer()
+        self._weights = LED_INDEX.buffer()
 
 
     def render(self, local_time, milliseconds, ticks_ms):
-        t_s = self.run_time(local_time, milliseconds)
+        t_s = self.run_time(local_time, milliseconds, self._period_ms)
         ### Classic small angle approximation
-        angle = self._start_angle * math.cos(self._coef * t_s)
-
-        cbri = 0.65 * self.brightness
-        il_radius = 0.22
-        for z_idx, bri in get_pixels_near_angle(math.pi + angle, il_radius):
-            #self._zip[z_idx] = (round(bri * bri * z_bri), 0, 0)
-            self._zip[z_idx] = (self.z_bri_norm(bri, cbri), 0, 0)
+        angle = self._start_angle * math.cos(self._phase_scale * t_s)
+
+        near = self._near
+        weights = self._weights
+        z_lut = self.z_lut
+        for n_idx in range(self._falloff.lookup(math.pi + angle, 0, near, weights)):
+            self._zip.set(near[n_idx], RED,
+                          z_lut[min(LUT_SIZE - 1, weights[n_idx] * _LUT_SCALE // FALLOFF_ONE)])
 
         return self.HALO_CHANGED
@@ -5,11 +5,20 @@
 
 from rainbow import wavelengthToRGBtuple
 
-from zc_bg import HaloBackground
+from math import pi
+
+from zc_bg import HaloBackground, LUT_ONE
+from zc_layout import layout
 from zc_utils import SECOND
 
 
+### 0.80 brightness, sqrt as lookup is for value squared
+_RGB_SCALE = 0.8944 * LUT_ONE
+
+
 class RotatingRainbow(HaloBackground):
+    FRAME_RATE = 0
+
     def __init__(self, zip_, mdisplaylist, brightness=1, options=None):
         super().__init__(zip_, mdisplaylist,  brightness, options)
         self.displayed = 1 << SECOND
@@ -18,12 +27,17 @@ class RotatingRainbow(HaloBackground):
     def render(self, local_time, milliseconds, ticks_ms):
         secs = local_time[SECOND]
 
-        cbri = 0.80 * self.brightness
-        for idx in range(len(self._zip)):
-            offset_idx = (idx - secs ) % len(self._zip)
-            rgb_n = wavelengthToRGBtuple(700 - 295 * offset_idx / len(self._zip))
-            self._zip[idx] = (self.z_bri_norm(rgb_n[0], cbri),
-                              self.z_bri_norm(rgb_n[1], cbri),
-                              self.z_bri_norm(rgb_n[2], cbri))
+        z_lut = self.z_lut
+        for first, count, _, start_angle in layout().rings:
+            ### Positions are in 1/(60 * count) of a turn
+            turn = 60 * count
+            start_off = round(start_angle / (2 * pi) * turn)
+            for r_idx in range(count):
+                ### How far the LED is behind the second hand
+                offset = (r_idx * 60 + start_off - secs * count) % turn
+                rgb_n = wavelengthToRGBtuple(700 - 295 * offset / turn)
+                self._zip[first + r_idx] = (z_lut[int(rgb_n[0] * _RGB_SCALE)],
+                                            z_lut[int(rgb_n[1] * _RGB_SCALE)],
+                                            z_lut[int(rgb_n[2] * _RGB_SCALE)])
 
         return self.HALO_CHANGED
@@ -3,10 +3,12 @@
 ### SPDX-License-Identifier: MIT
 
 
-from zc_bg import HaloBackground
+from zc_bg import HaloBackground, LUT_ONE
+from zc_layout import layout
 
 
 class Temperature(HaloBackground):
+    FRAME_RATE = 0
     MIN_TEMP = 5.0
     MAX_TEMP = 35.0
 
@@ -25,21 +27,30 @@ class Temperature(HaloBackground):
             self._temperature = 0.875 * self._temperature + 0.125 * self._function()
             self._last_s = local_time[5]
 
-        bottom_idx = len(self._zip) // 2
-        temp_idx = max(0, min(bottom_idx, round(bottom_idx
-                                                * (self.MAX_TEMP - self._temperature)
-                                                / (self.MAX_TEMP - self.MIN_TEMP))))
-        cbri = 0.60 * self.brightness
-        cbri = 0.60 * self.brightness
-        for idx in range(temp_idx, bottom_idx + 1):
-            ratio = idx / bottom_idx
-            r_lvl = self.z_bri_norm((max(0.0, 2.0 * (0.56 - ratio))) ** 0.4, cbri)
-            b_lvl = self.z_bri_norm((max(0.0, 2.0 * (ratio - 0.49))) ** 0.4, cbri)
-            ### For night/dim mode ensure minimum brightness of 2
-            rgb_col = (max(2, r_lvl) if r_lvl >= b_lvl else r_lvl,
+        ### Each ring fills from the bottom to the LED nearest to this level
+        level = max(0.0, min(1.0, (self.MAX_TEMP - self._temperature)
+                                  / (self.MAX_TEMP - self.MIN_TEMP)))
+        ### This is 0.60 brightness, sqrt as lookup is for value squared
+        scale = 0.7746 * LUT_ONE
+        z_lut = self.z_lut
+        ### For night/dim mode ensure minimum brightness of 2 after any dither gain
+        min_lvl = 2 << self.z_shift
+        led_layout = layout()
+        pairs = led_layout.x_pairs
+        for p_idx in range(0, len(pairs), 2):
+            idx = pairs[p_idx]
+            half = led_layout.ring(idx)[1] / 2
+            frac = led_layout.ring_frac(idx)
+            ### ratio is 0.0 at the top and 1.0 at the bottom
+            ratio = 2.0 * min(frac, 1.0 - frac)
+            if round(ratio * half) < round(level * half):
+                continue
+            r_lvl = z_lut[int((max(0.0, 2.0 * (0.56 - ratio))) ** 0.4 * scale)]
+            b_lvl = z_lut[int((max(0.0, 2.0 * (ratio - 0.49))) ** 0.4 * scale)]
+            rgb_col = (max(min_lvl, r_lvl) if r_lvl >= b_lvl else r_lvl,
                        0,
-                       max(2, b_lvl) if b_lvl > r_lvl else b_lvl)
+                       max(min_lvl, b_lvl) if b_lvl > r_lvl else b_lvl)
             self._zip[idx] = rgb_col
-            if idx != 0:
-                self._zip[len(self._zip) - idx] = rgb_col
+            if pairs[p_idx + 1] != idx:
+                self._zip[pairs[p_idx + 1]] = rgb_col
         return self.HALO_CHANGED
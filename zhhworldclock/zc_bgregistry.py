@@ -0,0 +1,94 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+import gc
+import sys
+
+
+class BackgroundRegistry:
+    """A list of backgrounds by module name where only the active one is
+       imported and constructed to keep peak memory use down.
+       With two layers the previous background can be kept for a transition."""
+
+    def __init__(self, layers, mdisplaylist, entries):
+        ### entries are (module name, class name, options)
+        self._layers = layers
+        self._layer_idx = 0
+        self._mdisplaylist = mdisplaylist
+        self._entries = entries
+        self._loaded_modules = []
+        self._previous_modules = []
+        self.idx = None
+        self.current = None
+        self.previous = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _construct(self, idx, brightness):
+        module_name, class_name, options = self._entries[idx]
+        already_loaded = list(sys.modules)
+        module = __import__(module_name)
+        ### Keep a note of all the modules imported by this background
+        self._loaded_modules.extend([name for name in sys.modules if name not in already_loaded])
+        del already_loaded
+
+        layer = self._layers[self._layer_idx]
+        layer.clear()
+        self.current = getattr(module, class_name)(layer,
+                                                   self._mdisplaylist,
+                                                   brightness,
+                                                   options)
+        self.idx = idx
+        return self.current
+
+    def load(self, idx, brightness, keep=False):
+        """Unload the current background and import and construct another one.
+           With keep the current one becomes previous until release_previous()
+           if there is a spare layer and enough memory.
+           The caller must not hold any references to the one being unloaded."""
+        self.release_previous()
+        if not keep or len(self._layers) < 2 or self.current is None:
+            self.unload()
+            return self._construct(idx, brightness)
+
+        self.previous = self.current
+        self._previous_modules = self._loaded_modules
+        self.current = None
+        self._loaded_modules = []
+        self._layer_idx = (self._layer_idx + 1) % len(self._layers)
+        try:
+            return self._construct(idx, brightness)
+        except MemoryError:
+            self.release_previous()
+        return self._construct(idx, brightness)
+
+    @staticmethod
+    def _release_modules(modules):
+        for name in modules:
+            try:
+                del sys.modules[name]
+            except KeyError:
+                pass
+        gc.collect()
+
+    def unload(self):
+        if self.current is None:
+            return
+
+        self.current.stop()
+        self.current = None
+        self._release_modules(self._loaded_modules)
+        self._loaded_modules = []
+
+    def release_previous(self):
+        """Unload the previous background once a transition has finished."""
+        if self.previous is None:
+            return
+
+        self.previous.stop()
+        self.previous = None
+        self._release_modules(self._previous_modules)
+        self._previous_modules = []
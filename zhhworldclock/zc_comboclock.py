@@ -125,6 +125,13 @@ class ComboClock:
         #print(oneday_s, rtc_time[5], since_ms/1000.0, cor_since_ms/1000.0, self._last_frac_ms)
         return (rtc_time, self._last_frac_ms, now_t_ms)
 
+    def next_edge_tms(self, now_tms, milliseconds):
+        """Predict the ticks_ms() value for the next second edge from the
+           milliseconds returned with now_tms, None if this is not known."""
+        if not self.resync_enabled or self._lost_sync != 0:
+            return None
+        return utime.ticks_add(now_tms, self.s_to_ts(1000 - milliseconds))
+
     def set_rtc_utc(self, current_utctime):
         self._rtc.time = current_utctime
 
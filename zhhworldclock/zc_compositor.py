@@ -0,0 +1,235 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+### Layers are preallocated bytearrays holding a frame for the ZIP LEDs
+### in the same byte order as the NeoPixel object to allow the composited
+### result to be written straight into its buffer
+
+
+RED = 0
+GREEN = 1
+BLUE = 2
+
+MODE_REPLACE = 0
+MODE_ADD = 1
+MODE_MAX = 2
+### Add to values which are dim and turn off the bright ones, this
+### is used to keep the clock hands visible over any background
+MODE_CONTRAST = 3
+### Fade from what is below to this layer by the weight for the position
+MODE_BLEND = 4
+
+_ZEROS = {}
+
+
+def _zeros(length):
+    ### Shared source for clearing bytearrays with a slice assignment
+    zeros = _ZEROS.get(length)
+    if zeros is None:
+        zeros = _ZEROS[length] = bytes(length)
+    return zeros
+
+
+class Layer:
+    """A frame for the ZIP LEDs with a subset of the NeoPixel interface plus
+       per channel methods which do not create tuples."""
+
+    def __init__(self, count, order=(0, 1, 2)):
+        self.buf = bytearray(count * 3)
+        self.order = order
+        self._count = count
+        self._zeros = _zeros(count * 3)
+        ### Range of pixels written to since last clear
+        self.lo = count
+        self.hi = 0
+
+    def __len__(self):
+        return self._count
+
+    def _touch(self, idx):
+        if idx < self.lo:
+            self.lo = idx
+        if idx >= self.hi:
+            self.hi = idx + 1
+
+    def __getitem__(self, idx):
+        offset = idx * 3
+        return (self.buf[offset + self.order[0]],
+                self.buf[offset + self.order[1]],
+                self.buf[offset + self.order[2]])
+
+    def __setitem__(self, idx, colour):
+        offset = idx * 3
+        self.buf[offset + self.order[0]] = colour[0]
+        self.buf[offset + self.order[1]] = colour[1]
+        self.buf[offset + self.order[2]] = colour[2]
+        self._touch(idx)
+
+    def fill(self, colour):
+        for idx in range(self._count):
+            self[idx] = colour
+
+    def clear(self):
+        if self.hi > self.lo:
+            self.buf[:] = self._zeros
+            self.lo = self._count
+            self.hi = 0
+
+    def get(self, idx, channel):
+        return self.buf[idx * 3 + self.order[channel]]
+
+    def set(self, idx, channel, value):
+        self.buf[idx * 3 + self.order[channel]] = value
+        self._touch(idx)
+
+    def add(self, idx, channel, value):
+        offset = idx * 3 + self.order[channel]
+        self.buf[offset] = min(255, self.buf[offset] + value)
+        self._touch(idx)
+
+    def max(self, idx, channel, value):
+        offset = idx * 3 + self.order[channel]
+        if value > self.buf[offset]:
+            self.buf[offset] = value
+        self._touch(idx)
+
+    def lerp(self, start, end, weight):
+        """Set every value to the one in start moved weight/256 of the way
+           to the one in end."""
+        buf = self.buf
+        for offset in range(len(buf)):
+            value = start[offset]
+            buf[offset] = value + ((end[offset] - value) * weight >> 8)
+        self.lo = 0
+        self.hi = self._count
+
+    def scale(self, idx, factor):
+        buf = self.buf
+        for offset in range(idx * 3, idx * 3 + 3):
+            buf[offset] = min(255, max(0, round(buf[offset] * factor)))
+
+
+class Compositor:
+    """Merges a stack of layers in one pass into the NeoPixel object's buffer."""
+
+    def __init__(self, zip_, max_layers=3):
+        self._zip = zip_
+        ### neopixel.py from micropython-lib keeps the data in buf with
+        ### the byte order in ORDER, other implementations have to be
+        ### written to a pixel at a time
+        self._out = getattr(zip_, "buf", None)
+        if self._out is not None:
+            self._order = tuple(getattr(zip_, "ORDER", (1, 0, 2)))[:3]
+            self._direct = True
+        else:
+            self._order = (0, 1, 2)
+            self._out = bytearray(len(zip_) * 3)
+            self._direct = False
+
+        self._layers = [None] * max_layers
+        self._modes = bytearray(max_layers)
+        self._weights = bytearray(max_layers)
+        ### Layers hold values multiplied by 2**dither_shift and the bits
+        ### below that are carried to the next frame in _error
+        self.dither_shift = 0
+        self.dither_carry = True  ### False rounds each frame for low frame rates
+        self._error = bytearray(len(self._out))
+
+    def layer(self):
+        """Create a new layer suitable for this compositor."""
+        return Layer(len(self._zip), self._order)
+
+    def stack(self, pos, layer, mode=MODE_REPLACE, weight=0):
+        """Put a layer (or None) at pos in the stack, 0 is the bottom."""
+        self._layers[pos] = layer
+        self._modes[pos] = mode
+        self._weights[pos] = weight
+
+    def weight(self, pos, weight):
+        """Set the weight out of 256 for a MODE_BLEND layer."""
+        self._weights[pos] = weight
+
+    def clear(self):
+        for layer in self._layers:
+            if layer is not None:
+                layer.clear()
+
+    def compose(self):
+        out = self._out
+        first = True
+        for pos in range(len(self._layers)):
+            layer = self._layers[pos]
+            if layer is None:
+                continue
+            mode = self._modes[pos]
+            if first:
+                first = False
+                if mode == MODE_REPLACE:
+                    out[:] = layer.buf
+                    continue
+                out[:] = layer._zeros  ### pylint: disable=protected-access
+
+            src = layer.buf
+            if mode == MODE_BLEND:
+                ### This covers every pixel as the layers below may have
+                ### drawn anywhere and need fading out
+                weight = self._weights[pos]
+                for offset in range(len(out)):
+                    under = out[offset]
+                    out[offset] = under + ((src[offset] - under) * weight >> 8)
+                continue
+
+            if layer.hi <= layer.lo:
+                continue
+            if mode == MODE_REPLACE:
+                for offset in range(layer.lo * 3, layer.hi * 3):
+                    out[offset] = src[offset]
+            elif mode == MODE_ADD:
+                for offset in range(layer.lo * 3, layer.hi * 3):
+                    value = src[offset]
+                    if value:
+                        value += out[offset]
+                        out[offset] = value if value < 256 else 255
+            elif mode == MODE_MAX:
+                for offset in range(layer.lo * 3, layer.hi * 3):
+                    value = src[offset]
+                    if value > out[offset]:
+                        out[offset] = value
+            elif mode == MODE_CONTRAST:
+                for offset in range(layer.lo * 3, layer.hi * 3):
+                    value = src[offset]
+                    if value:
+                        under = out[offset]
+                        if under < value >> 1:
+                            value += under
+                            out[offset] = value if value < 256 else 255
+                        else:
+                            out[offset] = 0
+
+        if first:
+            out[:] = _zeros(len(out))
+        if self.dither_shift:
+            self._dither(out)
+        if not self._direct:
+            for idx in range(len(self._zip)):
+                offset = idx * 3
+                self._zip[idx] = (out[offset], out[offset + 1], out[offset + 2])
+
+    def _dither(self, out):
+        ### Temporal dithering, the average over a few frames has the
+        ### extra precision of the values which were rounded down
+        shift = self.dither_shift
+        if not self.dither_carry:
+            half = 1 << (shift - 1)
+            for offset in range(len(out)):
+                out[offset] = (out[offset] + half) >> shift
+            return
+
+        mask = (1 << shift) - 1
+        error = self._error
+        for offset in range(len(out)):
+            value = out[offset] + error[offset]
+            out[offset] = value >> shift
+            error[offset] = value & mask
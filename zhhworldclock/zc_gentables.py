@@ -0,0 +1,131 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+### Generates zc_layout_tables.py with the geometry tables that zc_layout
+### and zc_spatial otherwise compute at start-up, this runs on a host with CPython
+###   python3 zc_gentables.py [LAYOUT ...]  write the tables for DEFAULT_LAYOUT or the named layouts
+###   python3 zc_gentables.py --check       check they match the computation on this host
+###
+### The numbers are packed little-endian in bytes objects, the floats as
+### float32 and the rest as 16bit ints, these become arrays when loaded
+### rather than an object for each number. The LED lists are used as bytes.
+### Only a copy frozen into the firmware stays in flash, an .mpy made with
+### mpy-cross loads its bytes into the heap but saves the computation and
+### its temporary lists, and the .py is too big to compile on a micro:bit.
+### Generate only the layouts in use to keep the module small.
+###
+### The check compares with this host's computation which uses double
+### precision before storing float32, the micro:bit calculates in float32
+### and may differ in the last bits of a position.
+
+import array
+import os
+import sys
+
+from zc_layout import DEFAULT_LAYOUT, LAYOUTS, Layout
+from zc_spatial import SpatialIndex
+
+
+TABLES_MODULE = "zc_layout_tables"
+
+_BYTES_PER_LINE = 24
+
+
+def _packed(values):
+    """The values of an array as little-endian bytes."""
+    if sys.byteorder != "little":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def compute(name):
+    """The tables for the named layout computed in the same way as on the micro:bit."""
+    source = LAYOUTS[name]
+    led_layout = Layout(*source)
+    index = SpatialIndex(led_layout)
+    ### pylint: disable=protected-access
+    return {"source": source,
+            "rings": tuple(led_layout.rings),
+            "ring_count": led_layout.ring_count,
+            "matrices": tuple(led_layout.matrices),
+            "count": led_layout.count,
+            "pos": _packed(led_layout.pos),
+            "spacing": _packed(led_layout.spacing),
+            "height_order": led_layout.height_order,
+            "x_pairs": led_layout.x_pairs,
+            "y_pairs": led_layout.y_pairs,
+            "qpos": _packed(index.qpos),
+            "spacing_q": _packed(index.spacing_q),
+            "band_start": _packed(index._band_start),
+            "band_split": _packed(index._band_split),
+            "band_leds": index._band_leds,
+            "cell_start": _packed(index._cell_start),
+            "cell_leds": index._cell_leds}
+
+
+def _literal(value, indent):
+    """Python source for value with long bytes split over lines."""
+    if isinstance(value, bytes) and len(value) > _BYTES_PER_LINE:
+        chunks = [repr(value[start:start + _BYTES_PER_LINE])
+                  for start in range(0, len(value), _BYTES_PER_LINE)]
+        return "(" + ("\n" + " " * (indent + 1)).join(chunks) + ")"
+    return repr(value)
+
+
+def source_text(names):
+    lines = ["### SPDX-FileCopyrightText: 2025 Kevin J. Walters",
+             "###",
+             "### SPDX-License-Identifier: MIT",
+             "",
+             "### Generated by zc_gentables.py from zc_layout.LAYOUTS - do not edit",
+             "",
+             "TABLES = {"]
+    for name in names:
+        lines.append('    "' + name + '": {')
+        for key, value in compute(name).items():
+            prefix = '        "' + key + '": '
+            lines.append(prefix + _literal(value, len(prefix)) + ",")
+        lines.append("    },")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def check():
+    """Compare the tables in the module with the computation on this host
+       returning the number of mismatches."""
+    from zc_layout_tables import TABLES  ### pylint: disable=import-outside-toplevel
+    mismatches = 0
+    for name, tables in TABLES.items():
+        if name not in LAYOUTS:
+            print(name, "not in LAYOUTS")
+            mismatches += 1
+            continue
+        for key, value in compute(name).items():
+            ### The packed float positions must be identical, not just close
+            if key not in tables or tables[key] != value:
+                print(name, key, "differs")
+                mismatches += 1
+    print("OK" if mismatches == 0 else "FAILED", len(TABLES), "layouts")
+    return mismatches
+
+
+def main(argv):
+    if "--check" in argv:
+        return 1 if check() else 0
+
+    names = argv if argv else [DEFAULT_LAYOUT]
+    for name in names:
+        if name not in LAYOUTS:
+            print(name, "not in LAYOUTS")
+            return 1
+    filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), TABLES_MODULE + ".py")
+    with open(filename, "w") as tables_file:
+        tables_file.write(source_text(names))
+    print("Wrote", filename)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,162 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+### Benchmark for the DigitalRain geometry with the original float code
+### (list returning LED lookups, vertical_line_near_pixel() tuples and
+### drops sliced from an array) and with the fixed point zc_spatial functions,
+### this is run rather than imported, on a host with the MicroPython unix port
+### (micropython zc_geombench.py) or CPython and on a micro:bit
+### Allocations are only counted by MicroPython, under CPython the two paths
+### take about the same time so the benefit is yet to be measured on MicroPython
+
+import array
+import gc
+import random
+
+try:
+    from utime import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter_ns
+    def ticks_us():
+        return perf_counter_ns() // 1000
+    def ticks_diff(end, start):
+        return end - start
+
+from zc_layout import layout
+from zc_spatial import LED_INDEX, MATRIX_BASE, Q_SHIFT, Q_ONE, to_q
+from zc_utils import vertical_line_near_pixel
+
+
+FRAMES = 200
+DROPS = 12
+IL_RADIUS = 0.08
+
+_HALF_WIDTH = 15
+
+
+### The lookups used by DigitalRain before zc_spatial
+def _baseline_tables():
+    led_layout = layout()
+    pos = led_layout.pos
+    z_spacing = led_layout.spacing[0]
+    z_leds_near_x = [[] for _ in range(_HALF_WIDTH * 2 + 1)]   ### [[]] * N is a trap!
+    for x_idx in range(len(z_leds_near_x)):
+        pos_x = (x_idx - _HALF_WIDTH) / _HALF_WIDTH
+        for zp_idx in led_layout.height_order:
+            if abs(pos[zp_idx * 2] - pos_x) < z_spacing / 1.8:
+                z_leds_near_x[x_idx].append(zp_idx)
+    return z_leds_near_x
+
+
+Z_LEDS_NEAR_X = _baseline_tables()
+
+
+def get_z_pixels_through_x(l_x):
+    p_idx = _HALF_WIDTH + round(l_x * _HALF_WIDTH)
+    if p_idx < 0 or p_idx >= len(Z_LEDS_NEAR_X):
+        return []
+    return Z_LEDS_NEAR_X[p_idx]
+
+
+def get_m_pixels_through_x(l_x):
+    pos = layout().pos
+    m_near_distance = layout().spacing[MATRIX_BASE] / 1.8
+    near_idxs = []
+    ### Scan the top row for nearby pixels
+    for p_idx in range(5):
+        if abs(pos[(MATRIX_BASE + p_idx) * 2] - l_x) < m_near_distance:
+            near_idxs.append(p_idx)
+    row_near_count = len(near_idxs)
+    if row_near_count == 0:
+        return near_idxs
+
+    ### duplicate first row to cover all the rows
+    near_idxs = near_idxs * 5
+    for mi_idx in range(row_near_count, len(near_idxs)):
+        near_idxs[mi_idx] += mi_idx // row_near_count * 5
+    return near_idxs
+
+
+def make_drops():
+    random.seed(1)
+    return [(random.uniform(-1.05, 1.05), random.uniform(-1.1, 1.1), random.uniform(0.5, 1.0))
+            for _ in range(DROPS)]
+
+
+def frame_baseline(drops, total):
+    pos = layout().pos
+    spacing = layout().spacing
+    for drop_no in range(DROPS):
+        x, y, trail_length = drops[drop_no * 3:drop_no * 3 + 3]
+        for p_idx in get_z_pixels_through_x(x):
+            distances = vertical_line_near_pixel(spacing[p_idx], x, y, y - trail_length,
+                                                 pos[p_idx * 2], pos[p_idx * 2 + 1])
+            if distances:
+                trail_bri = distances[1] * distances[1] * 0.75 + 0.25
+                total[0] += int(trail_bri * max(0, (IL_RADIUS - distances[0])) / IL_RADIUS * 255)
+        for m_idx in get_m_pixels_through_x(x):
+            idx = MATRIX_BASE + m_idx
+            distances = vertical_line_near_pixel(spacing[idx], x, y, y - trail_length,
+                                                 pos[idx * 2], pos[idx * 2 + 1])
+            if distances:
+                trail_bri = distances[1] * distances[1] * 0.75 + 0.25
+                total[0] += int(trail_bri * max(0, (IL_RADIUS - distances[0])) / IL_RADIUS * 255)
+
+
+def frame_fixed(drops_q, total):
+    near = NEAR
+    il_radius_q = to_q(IL_RADIUS)
+    spacing_q = LED_INDEX.spacing_q
+    for d_idx in range(0, len(drops_q), 3):
+        x = drops_q[d_idx]
+        y = drops_q[d_idx + 1]
+        y_top = y - drops_q[d_idx + 2]
+        for n_idx in range(LED_INDEX.x_band_q(x, near)):
+            idx = near[n_idx]
+            distance = LED_INDEX.vline_q(idx, spacing_q[idx], x, y, y_top)
+            if 0 <= distance < il_radius_q:
+                relint = LED_INDEX.relint_q
+                trail_bri = (relint * relint >> Q_SHIFT) * 3 // 4 + Q_ONE // 4
+                total[0] += trail_bri * (il_radius_q - distance) // il_radius_q * 255 >> Q_SHIFT
+
+
+NEAR = LED_INDEX.buffer()
+
+
+def bench(name, frame, drops):
+    total = [0]
+    frame(drops, total)  ### warm up
+    total[0] = 0
+    gc.collect()
+    gc.disable()
+    try:
+        alloc_start = gc.mem_alloc()
+    except AttributeError:
+        alloc_start = None
+    start_us = ticks_us()
+    for _ in range(FRAMES):
+        frame(drops, total)
+    dur_us = ticks_diff(ticks_us(), start_us)
+    alloc = None if alloc_start is None else gc.mem_alloc() - alloc_start
+    gc.enable()
+    print(name,
+          "fps", round(FRAMES * 1e6 / dur_us),
+          "us/frame", dur_us // FRAMES,
+          "bytes/frame", "n/a" if alloc is None else alloc // FRAMES,
+          "check", total[0] // FRAMES)
+
+
+def main():
+    drops = make_drops()
+    drops_f = array.array("f")
+    drops_q = array.array("i")
+    for x, y, trail_length in drops:
+        drops_f.extend((x, y, trail_length))
+        drops_q.extend((to_q(x), to_q(y), to_q(trail_length)))
+    bench("baseline", frame_baseline, drops_f)
+    bench("fixed", frame_fixed, drops_q)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+class QualityGovernor:
+    """Steps a background down through its QUALITY_LEVELS when render()
+       keeps exceeding the time budget and back up again when
+       there is plenty of headroom."""
+
+    def __init__(self, budget_us, *, down_after=3, up_after=50):
+        self._budget_us = budget_us
+        self._down_after = down_after
+        self._up_after = up_after
+        self._over = 0
+        self._under = 0
+        self.changes = 0
+
+    def reset(self, bg):
+        bg.quality = 0
+        self._over = self._under = 0
+
+    def update(self, bg, render_us):
+        if render_us > self._budget_us:
+            self._under = 0
+            self._over += 1
+            if self._over >= self._down_after:
+                self._over = 0
+                if bg.quality < bg.QUALITY_LEVELS - 1:
+                    bg.quality += 1
+                    self.changes += 1
+        elif render_us < self._budget_us // 2:
+            self._over = 0
+            self._under += 1
+            if self._under >= self._up_after:
+                self._under = 0
+                if bg.quality > 0:
+                    bg.quality -= 1
+                    self.changes += 1
+        else:
+            self._over = self._under = 0
@@ -0,0 +1,63 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+### Hand positions are in 1/SUBSTEPS of an LED
+SUBSTEPS = 16
+_SHIFT = 4
+_MASK = SUBSTEPS - 1
+
+### Each hand is spread over the LEDs at offsets -1 to +2 from the one
+### it's on by a triangular kernel, this gives three LEDs when on an
+### LED and two when half way between them
+_TAPS = 4
+_RADIUS = 1.25
+_WEIGHT_ONE = 256
+
+
+def _make_weights():
+    weights = bytearray(SUBSTEPS * _TAPS)
+    for frac in range(SUBSTEPS):
+        raw = [max(0.0, _RADIUS - abs(offset - frac / SUBSTEPS))
+               for offset in range(-1, _TAPS - 1)]
+        total = sum(raw)
+        for tap, weight in enumerate(raw):
+            weights[frac * _TAPS + tap] = round(weight * _WEIGHT_ONE / total)
+    return weights
+
+
+### Integer weights out of _WEIGHT_ONE for each quantised fraction of an LED
+_WEIGHTS = _make_weights()
+
+
+class Hands:
+    """Draws clock hands on a layer, when smooth is set these are
+       anti-aliased using the fractional part of the position,
+       ring is the (first LED, count) of the ring to use if the
+       layer has more than one."""
+
+    def __init__(self, layer, smooth=True, ring=None):
+        self._layer = layer
+        self._first, self._count = (0, len(layer)) if ring is None else ring[:2]
+        self.smooth = smooth
+
+    def position(self, value, count):
+        """Position on the ring for value out of count."""
+        return value * self._count * SUBSTEPS // count
+
+    def draw(self, pos, channel, value):
+        """Add a hand at pos which is in 1/SUBSTEPS of an LED."""
+        layer = self._layer
+        first = self._first
+        count = self._count
+        led_idx = pos >> _SHIFT
+        if not self.smooth:
+            layer.add(first + led_idx % count, channel, value)
+            return
+
+        w_idx = (pos & _MASK) * _TAPS
+        for tap in range(_TAPS):
+            weight = _WEIGHTS[w_idx + tap]
+            if weight:
+                layer.add(first + (led_idx + tap - 1) % count, channel, value * weight >> 8)
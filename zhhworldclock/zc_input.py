@@ -0,0 +1,123 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+from utime import ticks_diff
+
+
+### Events returned by Input.poll() as a bit mask
+EV_A = 0x01
+EV_B = 0x02
+EV_PIN1 = 0x04
+EV_LOGO_SHORT = 0x08
+EV_LOGO_LONG = 0x10
+EV_LOGO_VERY_LONG = 0x20
+EV_PRESENCE = 0x40  ### not from Input, used by callers for the presence sensor
+EV_LOGO = EV_LOGO_SHORT | EV_LOGO_LONG | EV_LOGO_VERY_LONG
+
+### Values for Input.logo_hold while logo is still being touched
+HOLD_NONE = 0
+HOLD_SHORT = 1
+HOLD_LONG = 2
+HOLD_VERY_LONG = 3
+
+
+class _Touch:
+    """Debounce for capacitive touch, a touch is only considered
+       over once it has not been touched for release_ms."""
+
+    def __init__(self, release_ms):
+        self._release_ms = release_ms
+        self.raw = False
+        self.down = False
+        self.start_tms = 0
+        self.last_tms = 0
+
+    def sample(self, touched, now_tms):
+        """Returns 1 on start of touch, -1 on end of touch, otherwise 0."""
+        self.raw = touched
+        if touched:
+            self.last_tms = now_tms
+            if not self.down:
+                self.down = True
+                self.start_tms = now_tms
+                return 1
+        elif self.down and ticks_diff(now_tms, self.last_tms) >= self._release_ms:
+            self.down = False
+            return -1
+        return 0
+
+    def held_ms(self):
+        return ticks_diff(self.last_tms, self.start_tms)
+
+
+class Input:
+    """Samples the buttons, logo and pin1 once per call to poll() classifying
+       logo touches by duration without waiting for them to finish."""
+
+    def __init__(self, button_a, button_b, pin_logo, pin1, *,
+                 short_ms, long_ms, very_long_ms, release_ms=150):
+        ### pylint: disable=too-many-arguments
+        self._button_a = button_a
+        self._button_b = button_b
+        self._pin_logo = pin_logo
+        self._pin1 = pin1
+        self._short_ms = short_ms
+        self._long_ms = long_ms
+        self._very_long_ms = very_long_ms
+
+        self._logo = _Touch(release_ms)
+        self._touch1 = _Touch(release_ms)
+        self._a_down = self._b_down = False
+        self.pin1_enabled = False
+        self.logo_hold = HOLD_NONE
+
+    @property
+    def active(self):
+        """True while a touch is in progress and needs frequent sampling."""
+        return self._logo.down or self._touch1.down
+
+    def pending(self):
+        """True if anything has changed since the last poll()."""
+        return (self._button_a.is_pressed() != self._a_down
+                or self._button_b.is_pressed() != self._b_down
+                or self._pin_logo.is_touched() != self._logo.raw
+                or self.pin1_enabled and self._pin1.is_touched() != self._touch1.raw)
+
+    def _classify(self, held_ms):
+        if held_ms > self._very_long_ms:
+            return HOLD_VERY_LONG
+        if held_ms > self._long_ms:
+            return HOLD_LONG
+        if held_ms > self._short_ms:
+            return HOLD_SHORT
+        return HOLD_NONE
+
+    def poll(self, now_tms):
+        events = 0
+        ### Button presses are counted by the firmware
+        self._a_down = self._button_a.is_pressed()
+        self._b_down = self._button_b.is_pressed()
+        if self._button_a.get_presses():
+            events |= EV_A
+        if self._button_b.get_presses():
+            events |= EV_B
+
+        if self.pin1_enabled and self._touch1.sample(self._pin1.is_touched(), now_tms) > 0:
+            events |= EV_PIN1
+
+        logo_change = self._logo.sample(self._pin_logo.is_touched(), now_tms)
+        if self._logo.down:
+            self.logo_hold = self._classify(self._logo.held_ms())
+        elif logo_change < 0:
+            self.logo_hold = HOLD_NONE
+            held_ms = self._logo.held_ms()
+            if held_ms < self._long_ms:
+                events |= EV_LOGO_SHORT
+            elif held_ms < self._very_long_ms:
+                events |= EV_LOGO_LONG
+            else:
+                events |= EV_LOGO_VERY_LONG
+
+        return events
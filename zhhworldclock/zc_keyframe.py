@@ -0,0 +1,49 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+from utime import ticks_diff
+
+
+class Keyframes:
+    """Renders a background only every KEYFRAME_MS and interpolates between
+       the last two keyframes on the frames in between, the output is
+       one keyframe interval behind the time given to render()."""
+
+    def __init__(self, count, mdisplaylist):
+        self._prev = bytearray(count * 3)
+        self._next = bytearray(count * 3)
+        self._mdisplaylist = mdisplaylist
+        ### The micro:bit display shows the latest keyframe without interpolation
+        self._matrix = bytearray(len(mdisplaylist))
+        self._key_tms = 0
+        self._updates = 0
+        self._valid = False
+        self.keyframes = 0
+
+    def reset(self):
+        """Start again with a new keyframe, e.g. after changing background."""
+        self._valid = False
+
+    def render(self, bg, local_time, milliseconds, now_tms):
+        interval_ms = bg.KEYFRAME_MS
+        layer = bg.layer
+        elapsed_ms = ticks_diff(now_tms, self._key_tms)
+        if not self._valid or elapsed_ms >= interval_ms:
+            self._prev, self._next = self._next, self._prev
+            self._updates = bg.render(local_time, milliseconds, now_tms)
+            self._next[:] = layer.buf
+            self._matrix[:] = self._mdisplaylist
+            if not self._valid or elapsed_ms >= 2 * interval_ms:
+                ### Too long since the last keyframe to interpolate from it
+                self._prev[:] = self._next
+            self._key_tms = now_tms
+            self._valid = True
+            self.keyframes += 1
+            elapsed_ms = 0
+        else:
+            self._mdisplaylist[:] = self._matrix
+
+        layer.lerp(self._prev, self._next, elapsed_ms * 256 // interval_ms)
+        return self._updates
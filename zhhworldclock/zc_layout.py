@@ -0,0 +1,151 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+import array
+from math import pi, sin, cos
+
+
+### Layout descriptions by name with dimensions in mm,
+### a ring is (LED count, radius, angle of first LED in degrees clockwise from top)
+### and a matrix is (columns, rows, pitch, x of left column, y of top row)
+### with the last value the distance that becomes 1.0 in the normalised coordinates
+### where top left of bounding square is -1,-1 and bottom right is 1,1,
+### rings are in the order they are chained with the outer one first
+### and the ring sizes other than HALO_HD's are nominal
+LAYOUTS = {"HALO_HD": (((60, 40.0, 0.0),),
+                       ((5, 5, 4.0, -8.0, -11.6),),  ### micro:bit display is a bit high
+                       40.0),
+           "RING_24": (((24, 40.0, 0.0),),
+                       ((5, 5, 4.0, -8.0, -11.6),),
+                       40.0),
+           "RING_12": (((12, 30.0, 0.0),),
+                       ((5, 5, 4.0, -8.0, -11.6),),
+                       30.0),
+           "DUAL_60_24": (((60, 40.0, 0.0), (24, 26.0, 0.0)),
+                          ((5, 5, 4.0, -8.0, -11.6),),
+                          40.0),
+          }
+DEFAULT_LAYOUT = "HALO_HD"
+
+### Optional tables made by zc_gentables.py, these are used instead of
+### computing them when the layout description matches, compiling the .py
+### on the micro:bit can run out of memory so only its .mpy or a frozen
+### copy should be used there
+try:
+    from zc_layout_tables import TABLES
+except (ImportError, MemoryError):
+    TABLES = {}
+
+### Positions within this of each other are considered the same for symmetry
+_SAME = 0.001
+
+_layout = None
+
+
+class Layout:
+    """The LED positions for some rings and matrices and the tables derived
+       from them, LEDs are numbered through the rings then the matrices
+       to match the order of the ZIP LEDs and the micro:bit display."""
+
+    def __init__(self, rings, matrices, scale, tables=None):
+        ### pylint: disable=too-many-locals
+        if tables is not None and tables["source"] == (rings, matrices, scale):
+            self.tables = tables
+            self.rings = tables["rings"]
+            self.ring_count = tables["ring_count"]
+            self.matrices = tables["matrices"]
+            self.count = tables["count"]
+            ### The numbers are packed in bytes to avoid an object for each one
+            self.pos = array.array("f", tables["pos"])
+            self.spacing = array.array("f", tables["spacing"])
+            self.height_order = tables["height_order"]
+            self.x_pairs = tables["x_pairs"]
+            self.y_pairs = tables["y_pairs"]
+            return
+
+        self.tables = None
+        self.rings = []  ### (first LED, count, normalised radius, start angle in radians)
+        pos = []
+        spacing = []
+        for count, radius, start_deg in rings:
+            start_angle = start_deg / 180.0 * pi
+            self.rings.append((len(spacing), count, radius / scale, start_angle))
+            for r_idx in range(count):
+                angle = start_angle + r_idx / count * 2 * pi
+                pos.append(sin(angle) * radius / scale)
+                pos.append(0.0 - cos(angle) * radius / scale)
+                spacing.append(2 * pi * radius / count / scale)
+        self.ring_count = len(spacing)
+
+        self.matrices = []  ### (first LED, columns, rows)
+        for columns, rows, pitch, left, top in matrices:
+            self.matrices.append((len(spacing), columns, rows))
+            for y_idx in range(rows):
+                for x_idx in range(columns):
+                    pos.append((left + x_idx * pitch) / scale)
+                    pos.append((top + y_idx * pitch) / scale)
+                    spacing.append(pitch / scale)
+
+        self.count = len(spacing)
+        self.pos = array.array("f", pos)
+        self.spacing = array.array("f", spacing)
+        del pos, spacing
+
+        ### Ring LEDs in height order, bottom first
+        self.height_order = bytes(sorted(range(self.ring_count),
+                                         key=lambda idx: (round(-self.pos[idx * 2 + 1], 4),
+                                                          -self.pos[idx * 2])))
+
+        ### Ring LEDs in pairs mirrored in the vertical axis (x_pairs)
+        ### or the horizontal axis (y_pairs) with each LED in one pair,
+        ### one on the axis or without a partner is paired with itself
+        self.x_pairs = self._mirror_pairs(-1.0, 1.0)
+        self.y_pairs = self._mirror_pairs(1.0, -1.0)
+
+    def ring(self, idx):
+        """The (first LED, count, normalised radius, start angle) of
+           the ring with LED idx or None if it is not on a ring."""
+        for ring in self.rings:
+            if ring[0] <= idx < ring[0] + ring[1]:
+                return ring
+        return None
+
+    def ring_frac(self, idx):
+        """The position of ring LED idx as a fraction of a turn clockwise from the top."""
+        first, count, _, start_angle = self.ring(idx)
+        return ((idx - first) / count + start_angle / (2 * pi)) % 1.0
+
+    def _find(self, x, y):
+        for idx in range(self.ring_count):
+            if abs(self.pos[idx * 2] - x) < _SAME and abs(self.pos[idx * 2 + 1] - y) < _SAME:
+                return idx
+        return None
+
+    def _mirror_pairs(self, x_mul, y_mul):
+        pairs = bytearray()
+        done = bytearray(self.ring_count)
+        for idx in range(self.ring_count):
+            if done[idx]:
+                continue
+            other = self._find(self.pos[idx * 2] * x_mul, self.pos[idx * 2 + 1] * y_mul)
+            if other is None:
+                other = idx
+            pairs.append(idx)
+            pairs.append(other)
+            done[idx] = done[other] = 1
+        return bytes(pairs)
+
+
+def select_layout(name):
+    """Make the named layout the one returned by layout()."""
+    global _layout  ### pylint: disable=global-statement
+    _layout = Layout(*LAYOUTS[name], tables=TABLES.get(name))
+    return _layout
+
+
+def layout():
+    if _layout is None:
+        return select_layout(DEFAULT_LAYOUT)
+    return _layout
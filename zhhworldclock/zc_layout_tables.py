@@ -0,0 +1,111 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+### Generated by zc_gentables.py from zc_layout.LAYOUTS - do not edit
+
+TABLES = {
+    "HALO_HD": {
+        "source": (((60, 40.0, 0.0),), ((5, 5, 4.0, -8.0, -11.6),), 40.0),
+        "rings": ((0, 60, 1.0, 0.0),),
+        "ring_count": 60,
+        "matrices": ((60, 5, 5),),
+        "count": 85,
+        "pos": (b'\x00\x00\x00\x00\x00\x00\x80\xbf\x05\x13\xd6=\xfd\x98~\xbf\xcd\xe6T>\xe2gz\xbf'
+                b'z7\x9e>qxs\xbf\xc9?\xd0>\x1d\xdei\xbf\x00\x00\x00?\xd7\xb3]\xbf'
+                b'\x18y\x16?\xbd\x1bO\xbf%L+?\xbd>>\xbf\xbd>>?%L+\xbf'
+                b'\xbd\x1bO?\x18y\x16\xbf\xd7\xb3]?\x00\x00\x00\xbf\x1d\xdei?\xc9?\xd0\xbe'
+                b'qxs?z7\x9e\xbe\xe2gz?\xcd\xe6T\xbe\xfd\x98~?\x05\x13\xd6\xbd'
+                b'\x00\x00\x80?21\x8d\xa4\xfd\x98~?\x05\x13\xd6=\xe2gz?\xcd\xe6T>'
+                b'qxs?z7\x9e>\x1d\xdei?\xc9?\xd0>\xd7\xb3]?\x00\x00\x00?'
+                b'\xbd\x1bO?\x18y\x16?\xbd>>?%L+?%L+?\xbd>>?'
+                b'\x18y\x16?\xbd\x1bO?\x00\x00\x00?\xd7\xb3]?\xc9?\xd0>\x1d\xdei?'
+                b'z7\x9e>qxs?\xcd\xe6T>\xe2gz?\x05\x13\xd6=\xfd\x98~?'
+                b'21\r%\x00\x00\x80?\x05\x13\xd6\xbd\xfd\x98~?\xcd\xe6T\xbe\xe2gz?'
+                b'z7\x9e\xbeqxs?\xc9?\xd0\xbe\x1d\xdei?\x00\x00\x00\xbf\xd7\xb3]?'
+                b'\x18y\x16\xbf\xbd\x1bO?%L+\xbf\xbd>>?\xbd>>\xbf%L+?'
+                b'\xbd\x1bO\xbf\x18y\x16?\xd7\xb3]\xbf\x00\x00\x00?\x1d\xdei\xbf\xc9?\xd0>'
+                b'qxs\xbfz7\x9e>\xe2gz\xbf\xcd\xe6T>\xfd\x98~\xbf\x05\x13\xd6='
+                b'\x00\x00\x80\xbf\xca\xc9S%\xfd\x98~\xbf\x05\x13\xd6\xbd\xe2gz\xbf\xcd\xe6T\xbe'
+                b'qxs\xbfz7\x9e\xbe\x1d\xdei\xbf\xc9?\xd0\xbe\xd7\xb3]\xbf\x00\x00\x00\xbf'
+                b'\xbd\x1bO\xbf\x18y\x16\xbf\xbd>>\xbf%L+\xbf%L+\xbf\xbd>>\xbf'
+                b'\x18y\x16\xbf\xbd\x1bO\xbf\x00\x00\x00\xbf\xd7\xb3]\xbf\xc9?\xd0\xbe\x1d\xdei\xbf'
+                b'z7\x9e\xbeqxs\xbf\xcd\xe6T\xbe\xe2gz\xbf\x05\x13\xd6\xbd\xfd\x98~\xbf'
+                b'\xcd\xccL\xbe\xe1z\x94\xbe\xcd\xcc\xcc\xbd\xe1z\x94\xbe\x00\x00\x00\x00\xe1z\x94\xbe'
+                b'\xcd\xcc\xcc=\xe1z\x94\xbe\xcd\xccL>\xe1z\x94\xbe\xcd\xccL\xbe\\\x8fB\xbe'
+                b'\xcd\xcc\xcc\xbd\\\x8fB\xbe\x00\x00\x00\x00\\\x8fB\xbe\xcd\xcc\xcc=\\\x8fB\xbe'
+                b'\xcd\xccL>\\\x8fB\xbe\xcd\xccL\xbe\xecQ\xb8\xbd\xcd\xcc\xcc\xbd\xecQ\xb8\xbd'
+                b'\x00\x00\x00\x00\xecQ\xb8\xbd\xcd\xcc\xcc=\xecQ\xb8\xbd\xcd\xccL>\xecQ\xb8\xbd'
+                b'\xcd\xccL\xbe\n\xd7#<\xcd\xcc\xcc\xbd\n\xd7#<\x00\x00\x00\x00\n\xd7#<'
+                b'\xcd\xcc\xcc=\n\xd7#<\xcd\xccL>\n\xd7#<\xcd\xccL\xbe\xaeG\xe1='
+                b'\xcd\xcc\xcc\xbd\xaeG\xe1=\x00\x00\x00\x00\xaeG\xe1=\xcd\xcc\xcc=\xaeG\xe1='
+                b'\xcd\xccL>\xaeG\xe1='),
+        "spacing": (b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6=Pw\xd6='
+                    b'\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc='
+                    b'\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc='
+                    b'\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc='
+                    b'\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc=\xcd\xcc\xcc='
+                    b'\xcd\xcc\xcc='),
+        "height_order": (b'\x1e\x1d\x1f\x1c \x1b!\x1a"\x19#\x18$\x17%\x16&\x15\'\x14(\x13)\x12'
+                         b'*\x11+\x10,\x0f-\x0e.\r/\x0c0\x0b1\n2\t3\x084\x075\x06'
+                         b'6\x057\x048\x039\x02:\x01;\x00'),
+        "x_pairs": (b'\x00\x00\x01;\x02:\x039\x048\x057\x066\x075\x084\t3\n2\x0b1'
+                    b"\x0c0\r/\x0e.\x0f-\x10,\x11+\x12*\x13)\x14(\x15'\x16&\x17%"
+                    b'\x18$\x19#\x1a"\x1b!\x1c \x1d\x1f\x1e\x1e'),
+        "y_pairs": (b'\x00\x1e\x01\x1d\x02\x1c\x03\x1b\x04\x1a\x05\x19\x06\x18\x07\x17\x08\x16\t\x15\n\x14\x0b\x13'
+                    b'\x0c\x12\r\x11\x0e\x10\x0f\x0f\x1f; :!9"8#7$6%5&4'
+                    b"'3(2)1*0+/,.--"),
+        "qpos": (b'\x00\x00\x00\xf0\xac\x01\x16\xf0T\x03Z\xf0\xf2\x04\xc8\xf0\x82\x06b\xf1\x00\x08%\xf2'
+                 b'h\t\x0e\xf3\xb5\n\x1c\xf4\xe4\x0bK\xf5\xf2\x0c\x98\xf6\xdb\r\x00\xf8\x9e\x0e~\xf9'
+                 b'8\x0f\x0e\xfb\xa6\x0f\xac\xfc\xea\x0fT\xfe\x00\x10\x00\x00\xea\x0f\xac\x01\xa6\x0fT\x03'
+                 b'8\x0f\xf2\x04\x9e\x0e\x82\x06\xdb\r\x00\x08\xf2\x0ch\t\xe4\x0b\xb5\n\xb5\n\xe4\x0b'
+                 b'h\t\xf2\x0c\x00\x08\xdb\r\x82\x06\x9e\x0e\xf2\x048\x0fT\x03\xa6\x0f\xac\x01\xea\x0f'
+                 b'\x00\x00\x00\x10T\xfe\xea\x0f\xac\xfc\xa6\x0f\x0e\xfb8\x0f~\xf9\x9e\x0e\x00\xf8\xdb\r'
+                 b'\x98\xf6\xf2\x0cK\xf5\xe4\x0b\x1c\xf4\xb5\n\x0e\xf3h\t%\xf2\x00\x08b\xf1\x82\x06'
+                 b'\xc8\xf0\xf2\x04Z\xf0T\x03\x16\xf0\xac\x01\x00\xf0\x00\x00\x16\xf0T\xfeZ\xf0\xac\xfc'
+                 b'\xc8\xf0\x0e\xfbb\xf1~\xf9%\xf2\x00\xf8\x0e\xf3\x98\xf6\x1c\xf4K\xf5K\xf5\x1c\xf4'
+                 b'\x98\xf6\x0e\xf3\x00\xf8%\xf2~\xf9b\xf1\x0e\xfb\xc8\xf0\xac\xfcZ\xf0T\xfe\x16\xf0'
+                 b'\xcd\xfc\\\xfbf\xfe\\\xfb\x00\x00\\\xfb\x9a\x01\\\xfb3\x03\\\xfb\xcd\xfc\xf6\xfc'
+                 b'f\xfe\xf6\xfc\x00\x00\xf6\xfc\x9a\x01\xf6\xfc3\x03\xf6\xfc\xcd\xfc\x8f\xfef\xfe\x8f\xfe'
+                 b'\x00\x00\x8f\xfe\x9a\x01\x8f\xfe3\x03\x8f\xfe\xcd\xfc)\x00f\xfe)\x00\x00\x00)\x00'
+                 b'\x9a\x01)\x003\x03)\x00\xcd\xfc\xc3\x01f\xfe\xc3\x01\x00\x00\xc3\x01\x9a\x01\xc3\x01'
+                 b'3\x03\xc3\x01'),
+        "spacing_q": (b'\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01'
+                      b'\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01'
+                      b'\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01'
+                      b'\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01'
+                      b'\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01\xad\x01'
+                      b'\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01'
+                      b'\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01\x9a\x01'
+                      b'\x9a\x01'),
+        "band_start": (b"\x00\x00\x07\x00\r\x00\x13\x00\x17\x00\x19\x00\x1b\x00\x1d\x00!\x00#\x00%\x00'\x00"
+                       b')\x000\x007\x00>\x00E\x00L\x00S\x00Z\x00\\\x00^\x00`\x00b\x00'
+                       b'f\x00h\x00j\x00l\x00p\x00v\x00|\x00\x83\x00'),
+        "band_split": (b"\x07\x00\r\x00\x13\x00\x17\x00\x19\x00\x1b\x00\x1d\x00!\x00#\x00%\x00'\x00)\x00"
+                       b'+\x002\x009\x00@\x00G\x00N\x00U\x00\\\x00^\x00`\x00b\x00f\x00'
+                       b'h\x00j\x00l\x00p\x00v\x00|\x00\x83\x00'),
+        "band_leds": (b"*+,-./0)*+/01'()123&'34&"
+                      b'4%5$6#$67#7"8!9!9 :<AFKP'
+                      b'\x1f;=BGLQ\x1f;=BGLQ\x1e\x00>CHMR\x1d\x01?'
+                      b'DINS\x1d\x01?DINS\x1c\x02@EJOT\x1b\x03\x1b\x03\x1a\x04'
+                      b'\x19\x05\x19\x18\x06\x05\x18\x06\x17\x07\x16\x08\x16\x15\t\x08\x15\x14\x13\x0b\n\t\x13\x12'
+                      b'\x11\r\x0c\x0b\x12\x11\x10\x0f\x0e\r\x0c'),
+        "cell_start": (b'\x00\x00\x00\x00\x04\x00\x07\x00\x0b\x00\x0f\x00\x0f\x00\x13\x00\x13\x00\x13\x00\x13\x00\x13\x00'
+                       b'\x17\x00\x1a\x00\x1a\x00 \x00)\x00)\x00,\x000\x000\x004\x00:\x00:\x00'
+                       b'>\x00B\x00B\x00B\x00B\x00B\x00F\x00F\x00J\x00M\x00Q\x00U\x00'
+                       b'U\x00'),
+        "cell_leds": (b'56789:;\x00\x01\x02\x03\x04\x05\x06\x071234\x08\t\n\x0b.'
+                      b'/0<=ABFG>?@CDEHIJ\x0c\r\x0e*+,-'
+                      b'KLPQMNORST\x0f\x10\x11\x12&\'()\x13\x14\x15\x16"#'
+                      b'$%\x1f !\x1b\x1c\x1d\x1e\x17\x18\x19\x1a'),
+    },
+}
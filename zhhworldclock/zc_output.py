@@ -0,0 +1,107 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+from zc_bg import HaloBackground
+
+
+class ZipOutput:
+    """Only sends a frame to the ZIP LEDs if it differs from the last one sent."""
+
+    def __init__(self, zip_):
+        self._zip = zip_
+        ### neopixel.py from micropython-lib keeps the data in buf
+        ### which can be compared in one go, other implementations
+        ### have to be read back a pixel at a time
+        self._buf = getattr(zip_, "buf", None)
+        self._last = bytearray(len(self._buf) if self._buf is not None else len(zip_) * 3)
+        self._last_updates = HaloBackground.HALO_CHANGED
+        self._valid = False
+
+        self.sent = 0
+        self.skipped = 0
+
+    def _changed(self):
+        if self._buf is not None:
+            if self._buf == self._last:
+                return False
+            self._last[:] = self._buf
+            return True
+
+        changed = False
+        last = self._last
+        for idx in range(len(self._zip)):
+            r, g, b = self._zip[idx]
+            offset = idx * 3
+            if last[offset] != r or last[offset + 1] != g or last[offset + 2] != b:
+                last[offset] = r
+                last[offset + 1] = g
+                last[offset + 2] = b
+                changed = True
+        return changed
+
+    def invalidate(self):
+        """Force the next frame to be sent, e.g. after a mode or background change."""
+        self._valid = False
+
+    def show(self, updates):
+        """Send the frame if needed, updates is the MICROBIT_CHANGED | HALO_CHANGED mask
+           for the frame with HALO_CHANGED meaning something was drawn on the ZIP LEDs."""
+        ### The ZIP LEDs are cleared each frame so if nothing was drawn on
+        ### this frame or the last one then it must still be black
+        if (self._valid
+                and not (updates | self._last_updates) & HaloBackground.HALO_CHANGED):
+            changed = False
+        else:
+            changed = self._changed() or not self._valid
+        self._last_updates = updates
+
+        if changed:
+            self._zip.show()
+            self._valid = True
+            self.sent += 1
+        else:
+            self.skipped += 1
+        return changed
+
+
+class MatrixOutput:
+    """Shows the micro:bit display values using one Image which is
+       only updated and shown if the values have changed."""
+
+    def __init__(self, display_, image, mdisplaylist):
+        self._display = display_
+        self._image = image
+        self._mdisplaylist = mdisplaylist
+        self._width = image.width()
+        self._last = bytearray(len(mdisplaylist))
+        self._zeros = bytes(len(mdisplaylist))
+        self._valid = False
+
+        self.sent = 0
+        self.skipped = 0
+
+    def clear(self):
+        self._mdisplaylist[:] = self._zeros
+
+    def invalidate(self):
+        """Force the next show() to update the display, e.g. after something
+           else has been shown on it."""
+        self._valid = False
+
+    def show(self):
+        values = self._mdisplaylist
+        if self._valid and values == self._last:
+            self.skipped += 1
+            return False
+
+        last = self._last
+        for idx in range(len(values)):
+            if values[idx] != last[idx] or not self._valid:
+                self._image.set_pixel(idx % self._width, idx // self._width, values[idx])
+        last[:] = values
+        self._display.show(self._image)
+        self._valid = True
+        self.sent += 1
+        return True
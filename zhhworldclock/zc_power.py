@@ -0,0 +1,59 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+from utime import ticks_diff
+
+
+### Power states in order of decreasing power use
+ACTIVE = 0
+DIMMED = 1  ### night time
+IDLE = 2    ### nobody seen recently
+DARK = 3    ### nobody seen recently and the room is dark
+
+
+class PowerStates:
+    """Chooses a power state from the presence sensor, ambient light and
+       night hours, without a presence sensor only ACTIVE and DIMMED are used."""
+
+    def __init__(self, presence_pin, now_tms, *, absent_s, dark_level, dusk=None, dawn=None):
+        ### pylint: disable=too-many-arguments
+        self._pin = presence_pin
+        self._absent_ms = absent_s * 1000
+        self._dark_level = dark_level
+        self._dusk = dusk
+        self._dawn = dawn
+        self._pir = 0
+        self._seen_tms = now_tms
+        ### Set once absent for long enough which also avoids ticks wrapping
+        self._absent = False
+        self.state = ACTIVE
+
+    def pending(self):
+        """True if the presence sensor has changed since the last update()."""
+        return self._pin is not None and self._pin.read_digital() != self._pir
+
+    def update(self, now_tms, hour, light_level, allowed=True):
+        """Update the state returning True if it has changed,
+           allowed is False to stay ACTIVE, e.g. in stopwatch mode."""
+        if self._pin is not None:
+            self._pir = self._pin.read_digital()
+            if self._pir:
+                self._seen_tms = now_tms
+                self._absent = False
+            elif not self._absent:
+                self._absent = ticks_diff(now_tms, self._seen_tms) > self._absent_ms
+
+        if not allowed:
+            state = ACTIVE
+        elif self._absent:
+            state = DARK if light_level < self._dark_level else IDLE
+        elif self._dusk is not None and (hour >= self._dusk or hour < self._dawn):
+            state = DIMMED
+        else:
+            state = ACTIVE
+
+        changed = state != self.state
+        self.state = state
+        return changed
@@ -0,0 +1,148 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+import array
+import gc
+
+from utime import ticks_us, ticks_diff
+
+
+class StageProfiler:
+    """Records the time taken by each stage of a loop in histograms with
+       power of two buckets, bucket 0 is below 2**min_shift microseconds
+       and the last one is for everything too big for the others.
+
+       With alloc enabled the heap allocated by each stage is recorded
+       using gc.mem_alloc() which walks the heap so timings will be
+       inflated if both are used together. An alloc_budget in bytes
+       per frame is checked at each start() with either a message
+       printed or a RuntimeError raised if it is exceeded."""
+
+    def __init__(self, names, *, bins=10, min_shift=6,
+                 timing=True, alloc=False, alloc_budget=0, budget_raise=False):
+        ### pylint: disable=too-many-arguments
+        self._names = names
+        self._bins = bins
+        self._min_shift = min_shift
+        self._timing = timing
+        self._alloc = alloc
+        self._alloc_budget = alloc_budget
+        self._budget_raise = budget_raise
+
+        ### Unsigned 16bit counts saturate rather than wrap
+        self._hist = array.array("H", [0] * (len(names) * bins))
+        ### Totals are reset by summary() before they get big
+        ### enough to need heap allocated ints
+        self._total_us = array.array("L", [0] * len(names))
+        self._max_us = array.array("L", [0] * len(names))
+        self._count = array.array("L", [0] * len(names))
+
+        ### Bytes allocated, largest allocation and count of
+        ### stages where a garbage collection occurred
+        self._alloc_bytes = array.array("L", [0] * len(names))
+        self._alloc_max = array.array("L", [0] * len(names))
+        self._gcs = array.array("L", [0] * len(names))
+        ### Per key (e.g. background name) values of
+        ### [calls, bytes, largest, gcs]
+        self._keyed = {}
+        self._frame_alloc = 0
+        self.over_budget = 0
+
+        self._mark_tus = ticks_us()
+        self._mark_alloc = gc.mem_alloc() if alloc else 0
+
+    def start(self):
+        """Start a new frame, this checks the allocation budget for the previous one."""
+        if self._alloc:
+            if self._alloc_budget and self._frame_alloc > self._alloc_budget:
+                self.over_budget += 1
+                if self._budget_raise:
+                    raise RuntimeError("Allocation budget exceeded: "
+                                       + str(self._frame_alloc))
+                print("ALLOC over budget", self._frame_alloc)
+            self._frame_alloc = 0
+            self._mark_alloc = gc.mem_alloc()
+        self._mark_tus = ticks_us()
+
+    def mark(self, stage, key=None):
+        """Record time and/or allocations since last start() or mark() for stage
+           and optionally against key too."""
+        now_tus = ticks_us()
+        if self._timing:
+            self.record(stage, ticks_diff(now_tus, self._mark_tus))
+        if self._alloc:
+            now_alloc = gc.mem_alloc()
+            self._record_alloc(stage, key, now_alloc - self._mark_alloc)
+            self._mark_alloc = now_alloc
+        self._mark_tus = ticks_us() if self._alloc else now_tus
+
+    def _record_alloc(self, stage, key, delta):
+        ### A garbage collection makes the delta negative and hides
+        ### the size of any allocation in the stage
+        gc_ran = delta < 0
+        if gc_ran:
+            self._gcs[stage] += 1
+        else:
+            self._alloc_bytes[stage] += delta
+            self._frame_alloc += delta
+            if delta > self._alloc_max[stage]:
+                self._alloc_max[stage] = delta
+
+        if key is not None:
+            values = self._keyed.get(key)
+            if values is None:
+                values = self._keyed[key] = array.array("L", [0] * 4)
+            values[0] += 1
+            if gc_ran:
+                values[3] += 1
+            else:
+                values[1] += delta
+                if delta > values[2]:
+                    values[2] = delta
+
+    def record(self, stage, dur_us):
+        bucket = 0
+        scaled = dur_us >> self._min_shift
+        while scaled and bucket < self._bins - 1:
+            scaled >>= 1
+            bucket += 1
+
+        h_idx = stage * self._bins + bucket
+        if self._hist[h_idx] < 0xffff:
+            self._hist[h_idx] += 1
+        self._total_us[stage] += dur_us
+        self._count[stage] += 1
+        if dur_us > self._max_us[stage]:
+            self._max_us[stage] = dur_us
+
+    def reset(self):
+        for idx in range(len(self._hist)):
+            self._hist[idx] = 0
+        for idx in range(len(self._names)):
+            self._total_us[idx] = self._max_us[idx] = self._count[idx] = 0
+            self._alloc_bytes[idx] = self._alloc_max[idx] = self._gcs[idx] = 0
+        self._keyed.clear()
+
+    def summary(self, reset=True):
+        """Print a line per stage of name, count, mean and max in us then
+           the histogram counts and/or name, bytes, largest and gcs for allocations."""
+        if self._timing:
+            print("PROF us buckets from <", 1 << self._min_shift, "by x2")
+            for stage, name in enumerate(self._names):
+                count = self._count[stage]
+                base = stage * self._bins
+                print("PROF", name, count,
+                      self._total_us[stage] // count if count else 0,
+                      self._max_us[stage],
+                      list(self._hist[base:base + self._bins]))
+        if self._alloc:
+            print("ALLOC over budget", self.over_budget)
+            for stage, name in enumerate(self._names):
+                print("ALLOC", name,
+                      self._alloc_bytes[stage], self._alloc_max[stage], self._gcs[stage])
+            for key, values in self._keyed.items():
+                print("ALLOC", key, values[0], values[1], values[2], values[3])
+        if reset:
+            self.reset()
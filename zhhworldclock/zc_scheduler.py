@@ -0,0 +1,35 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+from utime import ticks_ms, ticks_diff, ticks_add, sleep_ms
+
+
+class FrameScheduler:
+    """Sleeps until the deadline for the next frame while still checking for input."""
+
+    def __init__(self, poll_ms=10):
+        self._poll_ms = poll_ms
+        self._deadline_tms = ticks_ms()
+        self.frames = 0
+        self.early = 0  ### frames started before deadline due to input
+        self.slept_ms = 0
+
+    def next_frame(self, frame_start_tms, delay_ms):
+        """Set the deadline for the next frame relative to the start of this one."""
+        self._deadline_tms = ticks_add(frame_start_tms, max(0, delay_ms))
+
+    def wait(self, poll=None):
+        """Sleep until the deadline returning early if poll() returns True."""
+        self.frames += 1
+        while True:
+            remaining_ms = ticks_diff(self._deadline_tms, ticks_ms())
+            if remaining_ms <= 0:
+                return
+            if poll is not None and poll():
+                self.early += 1
+                return
+            nap_ms = min(remaining_ms, self._poll_ms)
+            sleep_ms(nap_ms)
+            self.slept_ms += nap_ms
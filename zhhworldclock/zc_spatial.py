@@ -0,0 +1,268 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+import array
+from math import pi, asin, sin
+
+from zc_layout import layout
+
+
+### LED numbers in the index are the ZIP LED index for the rings and
+### MATRIX_BASE + micro:bit display index for the matrix
+MATRIX_BASE = layout().ring_count
+LED_COUNT = layout().count
+
+_BANDS_HALF = 15
+_GRID = 6
+_GRID_MIN = -1.05
+_GRID_CELL = 2.1 / _GRID
+
+### Angles for AngleFalloff are quantised to 1/ANGLE_SUBSTEPS of an LED
+ANGLE_SUBSTEPS = 16
+_ANGLE_SHIFT = 4
+_ANGLE_MASK = ANGLE_SUBSTEPS - 1
+### Weights are out of FALLOFF_ONE which is 1.0 at the centre
+FALLOFF_ONE = 255
+
+### Fixed point positions and distances are Q_ONE for 1.0, integer
+### arithmetic avoids a heap allocation for every intermediate float
+Q_SHIFT = 12
+Q_ONE = 1 << Q_SHIFT
+
+
+def to_q(value):
+    return round(value * Q_ONE)
+
+
+def isqrt(value):
+    """Integer square root rounded down for 0 <= value < 2**30."""
+    root = 0
+    ### 1 << 30 would be a heap allocated int on the micro:bit, squared
+    ### Q12 distances within the display area are below 2**28
+    bit = 1 << 28
+    while bit > value:
+        bit >>= 2
+    while bit:
+        if value >= root + bit:
+            value -= root + bit
+            root = (root >> 1) + bit
+        else:
+            root >>= 1
+        bit >>= 2
+    return root
+
+
+class SpatialIndex:
+    """The positions from a zc_layout.Layout with precomputed buckets for
+       x-band, radius and angle queries, the queries write LED numbers
+       into a caller's buffer, e.g. from buffer(), and return the count
+       to avoid any allocation."""
+
+    def __init__(self, led_layout):
+        self._layout = led_layout
+        self.pos = led_layout.pos
+        ### The fraction along the line from the last vline_q() call
+        self.relint_q = 0
+
+        tables = led_layout.tables
+        if tables is None:
+            self._build(led_layout)
+        else:
+            self.qpos = array.array("h", tables["qpos"])
+            self.spacing_q = array.array("h", tables["spacing_q"])
+            self._band_start = array.array("H", tables["band_start"])
+            self._band_split = array.array("H", tables["band_split"])
+            self._band_leds = tables["band_leds"]
+            self._cell_start = array.array("H", tables["cell_start"])
+            self._cell_leds = tables["cell_leds"]
+
+    def _build(self, led_layout):
+        ### pylint: disable=too-many-locals
+        ### The same positions in fixed point
+        self.qpos = array.array("h", [to_q(value) for value in self.pos])
+        ### LED spacing for each LED in fixed point
+        self.spacing_q = array.array("h", [to_q(value) for value in led_layout.spacing])
+
+        ### The x-bands have the ring LEDs in height order (bottom first)
+        ### followed by the matrix LEDs, _band_split marks the boundary
+        band_count = _BANDS_HALF * 2 + 1
+        spacing = led_layout.spacing
+        self._band_start = array.array("H", [0] * (band_count + 1))
+        self._band_split = array.array("H", [0] * band_count)
+        band_leds = bytearray()
+        for b_idx in range(band_count):
+            band_x = (b_idx - _BANDS_HALF) / _BANDS_HALF
+            self._band_start[b_idx] = len(band_leds)
+            for idx in led_layout.height_order:
+                if abs(self.pos[idx * 2] - band_x) < spacing[idx] / 1.8:
+                    band_leds.append(idx)
+            self._band_split[b_idx] = len(band_leds)
+            for idx in range(led_layout.ring_count, led_layout.count):
+                if abs(self.pos[idx * 2] - band_x) < spacing[idx] / 1.8:
+                    band_leds.append(idx)
+        self._band_start[band_count] = len(band_leds)
+        self._band_leds = bytes(band_leds)
+
+        ### A coarse grid for the radius queries, each LED is in one cell
+        cells = [[] for _ in range(_GRID * _GRID)]   ### [[]] * N is a trap!
+        for idx in range(led_layout.count):
+            cells[self._cell(self.pos[idx * 2]) + self._cell(self.pos[idx * 2 + 1]) * _GRID].append(idx)
+        self._cell_start = array.array("H", [0] * (len(cells) + 1))
+        cell_leds = bytearray()
+        for c_idx, cell in enumerate(cells):
+            self._cell_start[c_idx] = len(cell_leds)
+            cell_leds.extend(cell)
+        self._cell_start[len(cells)] = len(cell_leds)
+        self._cell_leds = bytes(cell_leds)
+
+    @staticmethod
+    def _cell(value):
+        return min(_GRID - 1, max(0, int((value - _GRID_MIN) / _GRID_CELL)))
+
+    def buffer(self):
+        """A buffer big enough for the results of any query."""
+        return bytearray(self._layout.count)
+
+    def x_band(self, x, buf, matrix=True):
+        """LEDs with an x position near x, the ring ones are first
+           in height order (bottom first) then the matrix ones."""
+        return self._band(_BANDS_HALF + round(x * _BANDS_HALF), buf, matrix)
+
+    def x_band_q(self, qx, buf, matrix=True):
+        """x_band() for a fixed point x."""
+        return self._band(_BANDS_HALF + ((qx * _BANDS_HALF + (Q_ONE >> 1)) >> Q_SHIFT), buf, matrix)
+
+    def _band(self, b_idx, buf, matrix):
+        if b_idx < 0 or b_idx > _BANDS_HALF * 2:
+            return 0
+        start = self._band_start[b_idx]
+        end = self._band_start[b_idx + 1] if matrix else self._band_split[b_idx]
+        ### A loop rather than a slice as slicing bytes makes a new object
+        band_leds = self._band_leds
+        for l_idx in range(start, end):
+            buf[l_idx - start] = band_leds[l_idx]
+        return end - start
+
+    def within(self, x, y, radius, buf):
+        """LEDs within radius of (x, y)."""
+        pos = self.pos
+        cell_start = self._cell_start
+        cell_leds = self._cell_leds
+        radius_sq = radius * radius
+        count = 0
+        for cy_idx in range(self._cell(y - radius), self._cell(y + radius) + 1):
+            for cx_idx in range(self._cell(x - radius), self._cell(x + radius) + 1):
+                c_idx = cx_idx + cy_idx * _GRID
+                for l_idx in range(cell_start[c_idx], cell_start[c_idx + 1]):
+                    idx = cell_leds[l_idx]
+                    dx = pos[idx * 2] - x
+                    dy = pos[idx * 2 + 1] - y
+                    if dx * dx + dy * dy < radius_sq:
+                        buf[count] = idx
+                        count += 1
+        return count
+
+    def dist_q(self, idx, qx, qy):
+        """Distance from LED idx to (qx, qy) in fixed point."""
+        dx = qx - self.qpos[idx * 2]
+        dy = qy - self.qpos[idx * 2 + 1]
+        return isqrt(dx * dx + dy * dy)
+
+    def vline_q(self, idx, near_q, qx, qy_bottom, qy_top):
+        """The fixed point version of vertical_line_near_pixel() for LED idx,
+           this returns the distance or -1 if it is further than near_q
+           from the ends and sets relint_q to the fraction along the line."""
+        x_distance = abs(self.qpos[idx * 2] - qx)
+        qy = self.qpos[idx * 2 + 1]
+        if qy_top <= qy <= qy_bottom:  ### point is next to line
+            self.relint_q = (qy - qy_top) * Q_ONE // (qy_bottom - qy_top) if qy_bottom != qy_top else 0
+            return x_distance
+        if qy_bottom < qy < qy_bottom + near_q:
+            self.relint_q = Q_ONE
+            return isqrt(x_distance * x_distance + (qy - qy_bottom) * (qy - qy_bottom))
+        if qy_top - near_q < qy < qy_top:
+            self.relint_q = 0
+            return isqrt(x_distance * x_distance + (qy - qy_top) * (qy - qy_top))
+        return -1
+
+    def near_angle(self, angle, radius, buf, ring=0):
+        """Ring LEDs within radius of the point on the ring at angle
+           (clockwise from the top) in order of increasing distance."""
+        first, count, ring_radius, start_angle = self._layout.rings[ring]
+        ### radius becomes a number of LEDs either side using the chord length
+        span = 2.0 * asin(min(1.0, radius / ring_radius / 2.0)) / (2 * pi) * count
+        pos_f = (angle - start_angle) / (2 * pi) * count
+        nearest = round(pos_f)
+        offset = pos_f - nearest
+        found = 0
+        if abs(offset) < span:
+            buf[found] = first + nearest % count
+            found += 1
+        step = 1
+        while step <= span + 0.5:
+            ### The nearer of each pair of neighbours goes first
+            for direction in ((1, -1) if offset >= 0.0 else (-1, 1)):
+                if abs(step * direction - offset) < span:
+                    buf[found] = first + (nearest + step * direction) % count
+                    found += 1
+            step += 1
+        return found
+
+
+class AngleFalloff:
+    """A table of the ring LEDs within each of the radii of a point on
+       the ring and their linear falloff weights for every quantised angle,
+       this replaces the trigonometry and sqrt in get_pixels_near_angle()."""
+
+    def __init__(self, radii, ring=0):
+        ### The ring is symmetric so only the fraction of an LED matters,
+        ### each row has _width (offset, weight) pairs nearest first with
+        ### a weight of 0 marking the end of a shorter row
+        self._first, self._count, ring_radius, self._start_angle = layout().rings[ring]
+        spans = [int(2.0 * asin(min(1.0, radius / ring_radius / 2.0)) / (2 * pi) * self._count) + 1
+                 for radius in radii]
+        self._width = 2 * max(spans) + 1
+        row_count = len(radii) * ANGLE_SUBSTEPS
+        self._offsets = array.array("b", [0] * (row_count * self._width))
+        self._weights = bytearray(row_count * self._width)
+        for r_class, radius in enumerate(radii):
+            for frac in range(ANGLE_SUBSTEPS):
+                frac_f = frac / ANGLE_SUBSTEPS
+                row = []
+                for offset in range(-spans[r_class], spans[r_class] + 1):
+                    ### Chord length on the ring
+                    distance = 2.0 * ring_radius * abs(sin((offset - frac_f) * pi / self._count))
+                    weight = round((radius - distance) / radius * FALLOFF_ONE)
+                    if weight > 0:
+                        row.append((distance, offset, weight))
+                row.sort()
+                base = (r_class * ANGLE_SUBSTEPS + frac) * self._width
+                for e_idx, (_, offset, weight) in enumerate(row):
+                    self._offsets[base + e_idx] = offset
+                    self._weights[base + e_idx] = weight
+
+    def lookup(self, angle, r_class, idx_buf, weight_buf):
+        """Put the ring LEDs near angle (clockwise from the top) for
+           radius number r_class into idx_buf and their weights out of
+           FALLOFF_ONE into weight_buf returning the count."""
+        count = self._count
+        pos = int((angle - self._start_angle) * (count * ANGLE_SUBSTEPS / (2 * pi)) + 0.5)
+        led_idx = pos >> _ANGLE_SHIFT
+        base = (r_class * ANGLE_SUBSTEPS + (pos & _ANGLE_MASK)) * self._width
+        offsets = self._offsets
+        weights = self._weights
+        found = 0
+        for e_idx in range(base, base + self._width):
+            weight = weights[e_idx]
+            if weight == 0:
+                break
+            idx_buf[found] = self._first + (led_idx + offsets[e_idx]) % count
+            weight_buf[found] = weight
+            found += 1
+        return found
+
+
+### One shared index for all the backgrounds
+LED_INDEX = SpatialIndex(layout())
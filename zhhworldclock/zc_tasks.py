@@ -0,0 +1,63 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+import uasyncio as asyncio
+from utime import ticks_ms, ticks_diff, ticks_add
+
+
+class ClockTasks:
+    """Runs the stages of the clock as cooperative uasyncio tasks,
+       render() and comms() return the ms until they are next needed
+       and any events from poll_input() bring the next frame forward."""
+
+    def __init__(self, render, poll_input, sense, comms, *,
+                 input_ms=25, sense_ms=1000):
+        ### pylint: disable=too-many-arguments
+        self._render = render
+        self._poll_input = poll_input
+        self._sense = sense
+        self._comms = comms
+        self._input_ms = input_ms
+        self._sense_ms = sense_ms
+        self._redraw = False
+
+    async def _render_task(self):
+        while True:
+            frame_start_tms = ticks_ms()
+            deadline_tms = ticks_add(frame_start_tms, max(0, self._render()))
+            self._redraw = False
+            ### Naps are no longer than the input polling to react to input quickly
+            while not self._redraw:
+                remaining_ms = ticks_diff(deadline_tms, ticks_ms())
+                if remaining_ms <= 0:
+                    break
+                await asyncio.sleep_ms(min(remaining_ms, self._input_ms))
+
+    async def _input_task(self):
+        while True:
+            if self._poll_input():
+                self._redraw = True
+            await asyncio.sleep_ms(self._input_ms)
+
+    async def _sense_task(self):
+        while True:
+            self._sense()
+            await asyncio.sleep_ms(self._sense_ms)
+
+    async def _comms_task(self):
+        ### Outside the window this sleeps until the next one
+        while True:
+            await asyncio.sleep_ms(self._comms())
+
+    async def _main(self):
+        ### render task goes first as the others use the time it reads
+        await asyncio.gather(self._render_task(),
+                             self._input_task(),
+                             self._sense_task(),
+                             self._comms_task())
+
+    def run(self):
+        """Run the tasks forever, an exception in any of them stops them all."""
+        asyncio.run(self._main())
@@ -0,0 +1,111 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+from utime import ticks_diff
+
+from zc_bg import HaloBackground
+
+
+### A 5x5 font with 5 columns per glyph, bit 0 is the top row
+### Lower case letters use the upper case glyphs and glyphs
+### are trimmed of blank columns on the right
+_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789=/_-+:. "
+_FONT = (b"\x1e\x05\x05\x1e\x00\x1f\x15\x15\x0a\x00\x0e\x11\x11\x11\x00\x1f\x11\x11\x0e\x00"
+         b"\x1f\x15\x15\x11\x00\x1f\x05\x05\x01\x00\x0e\x11\x15\x1d\x00\x1f\x04\x04\x1f\x00"
+         b"\x11\x1f\x11\x00\x00\x08\x10\x0f\x00\x00\x1f\x04\x0a\x11\x00\x1f\x10\x10\x10\x00"
+         b"\x1f\x02\x04\x02\x1f\x1f\x02\x04\x1f\x00\x0e\x11\x11\x0e\x00\x1f\x05\x05\x02\x00"
+         b"\x0e\x11\x09\x16\x00\x1f\x05\x0d\x12\x00\x12\x15\x15\x09\x00\x01\x01\x1f\x01\x01"
+         b"\x0f\x10\x10\x0f\x00\x07\x08\x10\x08\x07\x1f\x08\x04\x08\x1f\x1b\x04\x04\x1b\x00"
+         b"\x01\x02\x1c\x02\x01\x19\x15\x15\x13\x00\x0e\x11\x0e\x00\x00\x12\x1f\x10\x00\x00"
+         b"\x19\x15\x15\x12\x00\x11\x15\x15\x0a\x00\x07\x04\x04\x1f\x00\x17\x15\x15\x09\x00"
+         b"\x0e\x15\x15\x08\x00\x01\x19\x05\x03\x00\x0a\x15\x15\x0a\x00\x02\x15\x15\x0e\x00"
+         b"\x0a\x0a\x0a\x00\x00\x10\x08\x04\x02\x01\x10\x10\x10\x10\x00\x04\x04\x04\x00\x00"
+         b"\x04\x0e\x04\x00\x00\x0a\x00\x00\x00\x00\x10\x00\x00\x00\x00\x00\x00\x00\x00\x00")
+_SPACE_WIDTH = 2
+_SIZE = 5
+
+
+def _glyph(char):
+    """Return (offset, width) of a character in _FONT, unknown ones are shown as a space."""
+    g_idx = _CHARS.find(char.upper())
+    if g_idx < 0:
+        g_idx = len(_CHARS) - 1
+    offset = g_idx * _SIZE
+    width = _SIZE
+    while width and _FONT[offset + width - 1] == 0:
+        width -= 1
+    return (offset, width if width else _SPACE_WIDTH)
+
+
+class ScrollText:
+    """Renders text into the micro:bit display values without blocking,
+       text which fits is shown centred, longer text scrolls one column
+       per step_ms and can loop."""
+
+    def __init__(self, mdisplaylist, *, step_ms=150, brightness=9):
+        self._mdisplaylist = mdisplaylist
+        self._step_ms = step_ms
+        self.brightness = brightness
+        self._columns = bytearray(0)
+        self._start_tms = 0
+        self._loop = False
+        self._scroll = False
+        self.text = None
+
+    @property
+    def active(self):
+        return self.text is not None
+
+    def start(self, text, now_tms, *, loop=False):
+        ### The columns for the whole text are created here to keep render() cheap
+        width = 0
+        for char in text:
+            width += _glyph(char)[1] + 1
+        width -= 1
+        self._scroll = width > _SIZE
+        ### Scrolling text starts and ends off the display
+        pad = _SIZE if self._scroll else (_SIZE - width) // 2
+        self._columns = bytearray(pad + width + (_SIZE if self._scroll else _SIZE - pad - width))
+        col_idx = pad
+        for char in text:
+            offset, g_width = _glyph(char)
+            self._columns[col_idx:col_idx + g_width] = _FONT[offset:offset + g_width]
+            col_idx += g_width + 1
+
+        self.text = text
+        self._loop = loop
+        self._start_tms = now_tms
+
+    def stop(self):
+        self.text = None
+
+    def next_step_ms(self, now_tms):
+        """Time until the text next moves or None if it is not scrolling."""
+        if self.text is None or not self._scroll:
+            return None
+        return self._step_ms - ticks_diff(now_tms, self._start_tms) % self._step_ms
+
+    def render(self, now_tms):
+        """Draw the text replacing current values, returns MICROBIT_CHANGED
+           or 0 if there is no text or it has finished scrolling."""
+        if self.text is None:
+            return 0
+
+        first_col = 0
+        if self._scroll:
+            first_col = ticks_diff(now_tms, self._start_tms) // self._step_ms
+            positions = len(self._columns) - _SIZE + 1
+            if first_col >= positions:
+                if not self._loop:
+                    self.text = None
+                    return 0
+                first_col %= positions
+
+        values = self._mdisplaylist
+        for x in range(_SIZE):
+            column = self._columns[first_col + x]
+            for y in range(_SIZE):
+                values[y * _SIZE + x] = self.brightness if column & (1 << y) else 0
+        return HaloBackground.MICROBIT_CHANGED
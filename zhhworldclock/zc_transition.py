@@ -0,0 +1,54 @@
+### SPDX-FileCopyrightText: 2025 Kevin J. Walters
+###
+### SPDX-License-Identifier: MIT
+
+
+from utime import ticks_diff
+
+from zc_compositor import MODE_REPLACE, MODE_BLEND
+
+
+class Crossfade:
+    """Fades from one background to another by stacking their layers
+       at pos and pos + 1 and raising the blend weight over duration_ms."""
+
+    def __init__(self, compositor, pos=0, duration_ms=800):
+        self._compositor = compositor
+        self._pos = pos
+        self._duration_ms = duration_ms
+        self._incoming_layer = None
+        self._start_tms = 0
+        self.outgoing = None
+
+    @property
+    def active(self):
+        return self.outgoing is not None
+
+    def show(self, bg):
+        """Show a background straight away with no transition."""
+        self.outgoing = None
+        self._compositor.stack(self._pos, bg.layer, MODE_REPLACE)
+        self._compositor.stack(self._pos + 1, None)
+
+    def start(self, outgoing, incoming, now_tms):
+        self.outgoing = outgoing
+        self._incoming_layer = incoming.layer
+        self._start_tms = now_tms
+        self._compositor.stack(self._pos, outgoing.layer, MODE_REPLACE)
+        self._compositor.stack(self._pos + 1, incoming.layer, MODE_BLEND, 0)
+
+    def finish(self):
+        """Show only the incoming background, the caller then frees the outgoing one."""
+        self.outgoing = None
+        self._compositor.stack(self._pos, self._incoming_layer, MODE_REPLACE)
+        self._compositor.stack(self._pos + 1, None)
+        self._incoming_layer = None
+
+    def update(self, now_tms):
+        """Set the weight for this frame, returns False once the fade has finished."""
+        elapsed_ms = ticks_diff(now_tms, self._start_tms)
+        if elapsed_ms >= self._duration_ms:
+            self.finish()
+            return False
+        self._compositor.weight(self._pos + 1, max(0, elapsed_ms) * 256 // self._duration_ms)
+        return True
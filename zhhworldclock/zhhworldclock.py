@@ -59,12 +59,13 @@
 
 import gc
 
+from micropython import const
 
 from microbit import Image, button_a, button_b, display, i2c, pin1, pin8, pin_logo, temperature
 import microbit
 import neopixel
 import radio
-from utime import ticks_ms, ticks_us, ticks_diff, ticks_add, sleep_ms
+from utime import ticks_ms, ticks_us, ticks_diff, ticks_add
 
 from mcp7940_tiny import MCP7940
 
@@ -72,26 +73,63 @@ from datecalc import DateCalc
 
 from zc_comboclock import ComboClock
 from zc_clockcomms import ClockComms, MsgTimeWms
-
-from zc_bg_blank import Blank
-#from zc_bg_milliseconds import Milliseconds
-#from zc_bg_digitalrain  import DigitalRain
-#from zc_bg_pendulum  import Pendulum
-#from zc_bg_fallingrainbow import FallingRainbow
-#from zc_bg_rotatingrainbow import RotatingRainbow
-#from zc_bg_brightnesstest import BrightnessTest
-from zc_bg_larsonscanner import LarsonScanner
-#from zc_bg_temperature import Temperature
-from zc_bg_flag import Flag
+from zc_output import MatrixOutput, ZipOutput
+from zc_text import ScrollText
+from zc_hands import Hands, SUBSTEPS
+from zc_scheduler import FrameScheduler
+from zc_governor import QualityGovernor
+from zc_input import Input, EV_A, EV_B, EV_PIN1, EV_LOGO, EV_LOGO_SHORT, EV_LOGO_LONG, EV_PRESENCE
+from zc_compositor import Compositor, MODE_CONTRAST, RED, GREEN, BLUE
+from zc_bgregistry import BackgroundRegistry
+from zc_transition import Crossfade
+from zc_keyframe import Keyframes
+from zc_power import PowerStates, ACTIVE, IDLE, DARK
+from zc_layout import select_layout
+
+from zc_bg import HaloBackground, LUT_ONE
 
 from zc_utils import YEAR, MONTH, MDAY, HOUR, MINUTE, SECOND, WEEKDAY
 
 radio.off()   ### the import turns it on
 
+### Set to 1 to time each stage of main loop, 2 to record heap allocations
+### per stage and per background or 3 for both, summaries are printed
+### every _PROFILE_PERIOD_S or when any character is received on serial
+### When 0 the compiler removes all the profiling code
+### _ALLOC_BUDGET is bytes allocated per frame above which a message is
+### printed or a RuntimeError is raised if _ALLOC_BUDGET_RAISE is 1
+_PROFILE = const(0)
+_PROFILE_PERIOD_S = const(60)
+_ALLOC_BUDGET = const(0)
+_ALLOC_BUDGET_RAISE = const(0)
+_P_CLOCK = const(0)
+_P_RENDER = const(1)
+_P_HANDS = const(2)
+_P_DISPLAY = const(3)
+_P_ZIP = const(4)
+_P_INPUT = const(5)
+_P_MISC = const(6)
+_P_COMMS = const(7)
+_P_EDGE = const(8)  ### latency from a second edge to it being shown
+if _PROFILE:
+    from microbit import uart
+    from zc_profile import StageProfiler
+    prof = StageProfiler(("clock", "render", "hands", "display", "zip", "input", "misc", "comms", "edge"),
+                         timing=bool(_PROFILE & 1),
+                         alloc=bool(_PROFILE & 2),
+                         alloc_budget=_ALLOC_BUDGET,
+                         budget_raise=bool(_ALLOC_BUDGET_RAISE))
+
 ### Any TZ offsets are positive for west and negative for east
 ### BRIGHTNESS is the normal value for room
 ### ADAPTIVE is additional amount scaled based on measured sunlight
 ### PIR is pin name for presence triggered brightness
+### SMOOTH set to 1 anti-aliases the hands over neighbouring LEDs
+### DITHER is the brightness below which temporal dithering is used, 0 for never
+### KEYFRAMES set to 1 interpolates between keyframes for the expensive backgrounds
+### PHASE_LOCK set to 1 animates backgrounds from UTC so synchronised clocks match
+### LAYOUT is the name of the LED layout from zc_layout.LAYOUTS, e.g. RING_24 or DUAL_60_24
+### ASYNC set to 1 runs the clock as uasyncio tasks if uasyncio is present
 cfg = {"CLOCK_PPM": 0.0,
        "RTC_PPM": 0.0,
        "NUMBER": 0,
@@ -100,7 +138,13 @@ cfg = {"CLOCK_PPM": 0.0,
        "ADAPTIVE": 0.9,
        "NIGHT": "20:7",
        "PIR": "",
-       "TZ": "GMT"}
+       "TZ": "GMT",
+       "SMOOTH": 1,
+       "DITHER": 0.05,
+       "KEYFRAMES": 1,
+       "PHASE_LOCK": 1,
+       "LAYOUT": "HALO_HD",
+       "ASYNC": 0}
 
 ### Optional variables in optional config.py
 ### THIS_MICROBIT_CLOCK_PPM
@@ -124,6 +168,13 @@ except (ImportError, SyntaxError):
 
 MASTER = cfg["NUMBER"] == 1 if cfg["NUMBER"] >= 1 else None
 
+ClockTasks = None
+if cfg["ASYNC"]:
+    try:
+        from zc_tasks import ClockTasks
+    except ImportError:
+        print("ASYNC", "uasyncio not available")
+
 DAY_NAME = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 BASE_YEAR = 2000
 
@@ -132,20 +183,20 @@ if len(BRI_STD) == 1:
     BRI_STD.append(BRI_STD[0])
 dusk, dawn = [int(x) for x in cfg["NIGHT"].split(":")] if cfg["NIGHT"].find(":") >= 0 else (None, None)
 adapt_bri = cfg["ADAPTIVE"]
-light_level = 0.0
 
 presence_pin = getattr(microbit, cfg["PIR"]) if cfg["PIR"] else None
 PRESENCE_TIME_S = 600
-presence_gone_t = None
+DARK_LIGHT_LEVEL = 8  ### filtered light level below which an empty room is dark
+IDLE_LIGHT_PERIOD_S = 10  ### light level is only read this often when idle
 
 print("NUMBER", cfg["NUMBER"])
-display.scroll("TZ=" + cfg["TZ"])
 
 ### MCP7940 fine trim is multiples of 2 cycles per minute for 32.768kHz crystal
 PPM_TO_TRIM_CONV = 32768 * 60 / (2 * 1000 * 1000)
 
-### ZIP Halo HD has 60 RGB LEDs
-ZIPCOUNT = 60
+### The ZIP LEDs are the rings of the layout, ZIP Halo HD has 60 RGB LEDs
+LAYOUT = select_layout(cfg["LAYOUT"])
+ZIPCOUNT = LAYOUT.ring_count
 BLACK = (0, 0, 0)
 ##MCP_POR_TIME = (2000, 1, 1, 0, 0, 0, 0, 0)
 
@@ -155,30 +206,26 @@ SHORT_DUR_MS = 175
 
 RADIO_TX_MS = 3  ### A guess at time taken to transmit
 
-
-def calc_brightness(md_idx, r_ltime, light_lvl, humans):
-    global presence_gone_t  ### pylint: disable=global-statement
-
-    value = BRI_STD[0]  ### day level
-    if adapt_bri:
-        ### Quantize value to mostly stop this changing with tiny light level changes
-        value += round(light_lvl / 16.0) / 16.0 * adapt_bri
-
-    ### Dim value for clock mode and if it's either night time
-    ### or a human has not been detected by presence sensor recently
-    if md_idx != CLOCK or BRI_STD[0] == BRI_STD[1]:
-        pass
-    elif dusk is not None and (r_ltime[HOUR] >= dusk or r_ltime[HOUR] < dawn):
-        value = BRI_STD[1]  ### dim night level
-    elif humans is not None:
-        if humans:
-            presence_gone_t = list(r_ltime)
-            DateCalc.add(presence_gone_t, PRESENCE_TIME_S)
-
-        if DateCalc.cmp(r_ltime, presence_gone_t) > 0:
-            value = BRI_STD[1]  ### dim night value
-
-    return value
+### Normalised brightness of hands as indices for brightness lookup tables
+R_HAND_LUT_IDX = round(0.79 * LUT_ONE)
+G_HAND_LUT_IDX = round(0.62 * LUT_ONE)
+B_HAND_LUT_IDX = round(0.90 * LUT_ONE)
+
+### Frame scheduling, backgrounds have their own rate in FRAME_RATE
+EDGE_MARGIN_MS = 3  ### aim for just after the second changes
+EDGE_PREPARE_MS = 20  ### render the next second this far ahead of a predicted edge
+STOPWATCH_FRAME_MS = 17  ### millisecond hand moves every 1000/60 ms
+SMOOTH_FRAME_MS = 1000 // SUBSTEPS  ### smooth second hand moves 1/SUBSTEPS of an LED
+TIME_SET_FRAME_MS = 100
+RADIO_POLL_MS = 50  ### upper limit on frame time when listening on radio
+INPUT_POLL_MS = 25  ### upper limit on frame time while logo or pin1 are touched
+### Time for background render() above which quality is reduced
+RENDER_BUDGET_US = 12_000
+### Crossfade between backgrounds
+FADE_MS = 800
+FADE_FRAME_MS = 40
+### Temporal dithering needs a fast and steady frame rate
+DITHER_FRAME_MS = 20
 
 pin1.set_touch_mode(pin1.CAPACITIVE)
 
@@ -218,13 +265,6 @@ zip_px.show()
 ### SADLY IT DOES NOT
 ##set_high_drive(0, 10)  ### pin8 is P0.10/NFC2
 
-display_image = bytearray(25)   ### values are 0..9
-def show_display_image():
-    display.show(Image(5, 5, display_image))
-
-show_display_image()
-gc.collect()
-
 clock = ComboClock(mcp,
                    rtc_clock_drift_ppm=cfg["RTC_PPM"],
                    rtc_trim_conv=PPM_TO_TRIM_CONV,
@@ -234,292 +274,595 @@ clock = ComboClock(mcp,
 
 comms = ClockComms(radio, cfg["NUMBER"])
 
-stopwatch_hmsms = [0, 0, 0, 0.0]
-
-mode_idx = 0
 mode = "cst"   ### first character of each mode
 ROTATE_MODES = 2
 CLOCK = 0
 STOPWATCH = 1
 TIME_SET = 2
-
-
-def zip_map(z_idx, count=60):
-    """Map to a ZIP pixel position, idx can be a float."""
-    return int(z_idx * ZIPCOUNT // count)
-
-background_idx = 0
-disp_bri = BRI_STD[0]
-background = (Blank(zip_px, display_image, disp_bri),
-              #Milliseconds(zip_px, display_image, disp_bri),
-              #DigitalRain(zip_px, display_image, disp_bri),
-              #Pendulum(zip_px, display_image, disp_bri),
-              #FallingRainbow(zip_px, display_image, disp_bri)
-              #RotatingRainbow(zip_px, display_image, disp_bri),
-              #BrightnessTest(zip_px, display_image, disp_bri),
-              LarsonScanner(zip_px, display_image, disp_bri),
-              #Temperature(zip_px, display_image, disp_bri, {"function": temperature}),
-              Flag(zip_px, display_image, disp_bri, {"flag": "ukraine wales poland"})
+### Shown while logo is touched in clock mode for next [b]ackground,
+### next mode and [t]ime set
+HOLD_CHARS = " b" + mode[(CLOCK + 1) % ROTATE_MODES] + "t"
+
+
+### Only the current background is imported, the previous one is kept
+### during a crossfade, and the two layers are shared so all of these
+### can be used without running out of memory
+### Left out of the rotation on purpose:
+###   Milliseconds is for checking synchronisation between clocks
+###   BrightnessTest is a fixed ramp for checking the LED brightness levels
+###   Microbit is superseded by MicrobitHour which does not allocate a list
+###   HourGlass has no render() yet
+BACKGROUNDS = (("zc_bg_blank", "Blank", None),
+               #("zc_bg_milliseconds", "Milliseconds", None),
+               ("zc_bg_digitalrain", "DigitalRain", None),
+               ("zc_bg_pendulum", "Pendulum", None),
+               ("zc_bg_fallingrainbow", "FallingRainbow", None),
+               ("zc_bg_rotatingrainbow", "RotatingRainbow", None),
+               #("zc_bg_brightnesstest", "BrightnessTest", None),
+               ("zc_bg_larsonscanner", "LarsonScanner", None),
+               ("zc_bg_temperature", "Temperature", {"function": temperature}),
+               ("zc_bg_flag", "Flag", {"flag": "ukraine wales poland"}),
+               ("zc_bg_microbithour", "MicrobitHour", None)
               )
-gc.collect()
+HaloBackground.dither_below = cfg["DITHER"]
+HaloBackground.phase_locked = bool(cfg["PHASE_LOCK"])
 
-bg = background[background_idx]
-bg.start(*clock.localtime_with_ms_and_ticks)
-bg_displayed = bg.displayed
-updates = 0
-time_set_change = 0  ### 3-6 for hour minute second and 10 for am/pm
 FIRST_TX_DUR_TMS = clock.s_to_ts(61_000)
 TX_PERIOD_TMS = clock.s_to_ts(9_900)
 SYNC_PERIOD_TMS = clock.s_to_ts(57 * 60_000)
-clock_start_tms = ticks_ms()
-last_tx_tms = ticks_add(clock_start_tms, 0 - TX_PERIOD_TMS)
-last_sync_tms = ticks_add(clock_start_tms, 0 - SYNC_PERIOD_TMS)
-new_sec = True
-last_ss = None
-first_comms_done = False
-r_bri = g_bri = b_bri = None
-
-### TODO there are many global variables and creating new ones in loop
-### can cause MemoryException as the dict that stores them is enlarged
-incrdecr = base = wrap = 0
-t1_ms = t2_ms = ticks_ms()
 
-gc.collect()
-while True:
-    if mode_idx != STOPWATCH:
-        ### clear micro:bit display
-        for idx in range(len(display_image)):
-            display_image[idx] = 0
-    zip_px.fill(BLACK)
-
-    rtc_localtime, rtc_utctime, ss_ms, now_tms = clock.localandutctime_with_ms_and_ticks
-    if mode_idx == CLOCK:
-        updates = bg.render(rtc_localtime, ss_ms, now_tms)
-
-    new_sec = rtc_localtime[SECOND] != last_ss
-    last_ss = rtc_localtime[SECOND]
-    if new_sec:
-        disp_bri = calc_brightness(mode_idx,
-                                   rtc_localtime,
-                                   light_level,
-                                   presence_pin.read_digital() if presence_pin else None)
-        if disp_bri != bg.brightness or r_bri is None:
-            bg.brightness = disp_bri
-            r_bri = bg.z_bri_norm(0.79, disp_bri)
-            g_bri = bg.z_bri_norm(0.62, disp_bri)
-            b_bri = bg.z_bri_norm(0.90, disp_bri)
-
-    h_idx = m_idx = s_idx = ms_idx = None
-    display_char = None
-    if mode_idx == STOPWATCH:
-        time_ms = clock.stopwatch_time_ms()
-        stopwatch_hmsms[:] = [time_ms // 3600000,
-                              time_ms // 60000 % 60,
-                              time_ms // 1000 % 60,
-                              time_ms % 1000]
-        h_idx = zip_map(stopwatch_hmsms[0], 12) % ZIPCOUNT
-        m_idx = zip_map(stopwatch_hmsms[1])
-        s_idx = zip_map(stopwatch_hmsms[2])
-        ms_idx = zip_map(stopwatch_hmsms[3], 1000)
-    elif mode_idx == CLOCK:
-        ### pylint: disable=superfluous-parens
-        if not (bg_displayed & (1 << HOUR)):
-            h_idx = zip_map(rtc_localtime[HOUR], 12) % ZIPCOUNT
-        if not (bg_displayed & (1 << MINUTE)):
-            m_idx = zip_map(rtc_localtime[MINUTE])
-        if not (bg_displayed & (1 << SECOND)):
-            s_idx = zip_map(rtc_localtime[SECOND])
-    elif mode_idx == TIME_SET:
-        if time_set_change in (HOUR, MINUTE, SECOND):
-            flash_on = (now_tms % 1000) > 300.0
-            if time_set_change != HOUR or flash_on:
-                h_idx = zip_map(rtc_localtime[HOUR], 12) % ZIPCOUNT
-            display_char = ("p" if rtc_localtime[HOUR] >= 12 else "a")
-            if time_set_change != MINUTE or flash_on:
-                m_idx = zip_map(rtc_localtime[MINUTE])
-            if time_set_change != SECOND or flash_on:
-                s_idx = zip_map(rtc_localtime[SECOND])
-        else:
-            if time_set_change == YEAR:  ### Yellow
-                h_idx = m_idx = zip_map(rtc_localtime[YEAR] - BASE_YEAR)
-                print(rtc_localtime[YEAR])
-                display_char = "y"
-            elif time_set_change == MONTH:  ### Magenta
-                h_idx = s_idx = zip_map(rtc_localtime[MONTH])  ### starts at 1
-                display_char = "m"
-            elif time_set_change == MDAY:  ### Cyan
-                b_idx = s_idx = zip_map(rtc_localtime[MDAY])  ### starts at 1
-                display_char = "d"
-            elif time_set_change == WEEKDAY:
-                h_idx = m_idx = s_idx = rtc_localtime[WEEKDAY]
-                display_char = DAY_NAME[rtc_localtime[WEEKDAY]][:2]
-
-    if h_idx is not None:
-        bri = min(255, zip_px[h_idx][0] + r_bri) if zip_px[h_idx][0] < r_bri >> 1 else 0
-        zip_px[h_idx] = (bri, zip_px[h_idx][1], zip_px[h_idx][2])
-    if m_idx is not None:
-        bri = min(255, zip_px[m_idx][1] + g_bri) if zip_px[m_idx][1] < g_bri >> 1 else 0
-        zip_px[m_idx] = (zip_px[m_idx][0], bri, zip_px[m_idx][2])
-    if s_idx is not None:
-        bri = min(255, zip_px[s_idx][2] + b_bri) if zip_px[s_idx][2] < b_bri >> 1 else 0
-        zip_px[s_idx] = (zip_px[s_idx][0], zip_px[s_idx][1], bri)
-    if ms_idx is not None:
-        bri = (min(255, zip_px[ms_idx][0] + r_bri * 2
-               if clock.stopwatch_running
-               else r_bri * 3 // 2) if zip_px[ms_idx][0] < r_bri >> 1 else 0)
-        zip_px[ms_idx] = (bri, zip_px[ms_idx][1], zip_px[ms_idx][2])
-    ##updates |= HaloBackground.HALO_CHANGED
-
-    if display_char is not None:
-        if len(display_char) == 1:
-            display.show(display_char)
+
+class ClockApp:
+    """The clock, stopwatch and time setting with the stages of the main loop
+       as methods which either run in turn or as separate uasyncio tasks.
+       All attributes are created here and any per-frame scratch values are
+       preallocated to keep memory use flat as MicroPython ignores __slots__."""
+
+    def __init__(self, zip_):
+        ### pylint: disable=too-many-instance-attributes,too-many-statements
+        self.zip_out = ZipOutput(zip_)
+        self.compositor = Compositor(zip_)
+        ### Backgrounds are at 0 and 1 (during a crossfade) and the hands on top
+        hands_layer = self.compositor.layer()
+        self.compositor.stack(2, hands_layer, MODE_CONTRAST)
+        ### The hands are on the outer ring
+        self.hands = Hands(hands_layer, smooth=bool(cfg["SMOOTH"]), ring=LAYOUT.rings[0])
+
+        self.display_image = bytearray(25)   ### values are 0..9
+        self.matrix_out = MatrixOutput(display, Image(5, 5), self.display_image)
+        self.matrix_out.show()
+        ### Text is drawn over the background without stopping the clock
+        self.text = ScrollText(self.display_image)
+        self.text.start("TZ=" + cfg["TZ"], ticks_ms())
+
+        self.background = BackgroundRegistry((self.compositor.layer(), self.compositor.layer()),
+                                             self.display_image,
+                                             BACKGROUNDS)
+        self.fade = Crossfade(self.compositor, duration_ms=FADE_MS)
+        self.keyframes = Keyframes(ZIPCOUNT, self.display_image) if cfg["KEYFRAMES"] else None
+        self.governor = QualityGovernor(RENDER_BUDGET_US)
+        self.scheduler = FrameScheduler()
+        self.user_input = Input(button_a, button_b, pin_logo, pin1,
+                                short_ms=SHORT_DUR_MS, long_ms=LONG_DUR_MS, very_long_ms=VERY_LONG_DUR_MS)
+        gc.collect()
+
+        self.mode_idx = CLOCK
+        self.time_set_change = 0  ### 3-6 for hour minute second and 10 for am/pm
+        self.disp_bri = BRI_STD[0]
+        ### Brightness of each hand indexed by RED, GREEN, BLUE and the
+        ### display brightness these are for
+        self.hand_bri = bytearray(3)
+        self._hand_bri_for = None
+        self.light_level = 0.0
+        self._light_s = 0
+        self.power = PowerStates(presence_pin, ticks_ms(),
+                                 absent_s=PRESENCE_TIME_S, dark_level=DARK_LIGHT_LEVEL,
+                                 dusk=dusk, dawn=dawn)
+        self.stopwatch_hmsms = [0, 0, 0, 0]
+
+        self.rtc_localtime, self.rtc_utctime, self.ss_ms, self.now_tms = clock.localandutctime_with_ms_and_ticks
+        self.last_ss = None
+        self.new_sec = True
+        self._edge_tms = None  ### predicted ticks_ms() of the next second edge
+        self._prepared = False  ### last frame was drawn for the next second
+        ### A frame drawn ahead of a second edge waiting to be shown on it
+        self._held_tms = None
+        self._held_updates = 0
+        self._held_delay_ms = 0
+        self.hold_char = None
+        self.last_updates = 0
+
+        self.first_comms_done = False
+        self.clock_start_tms = ticks_ms()
+        self.last_tx_tms = ticks_add(self.clock_start_tms, 0 - TX_PERIOD_TMS)
+        self.last_sync_tms = ticks_add(self.clock_start_tms, 0 - SYNC_PERIOD_TMS)
+        self.prof_s = 0
+
+        self.bg = self.background.load(0, self.disp_bri)
+        self.fade.show(self.bg)
+        self.bg.start(self.rtc_localtime, self.ss_ms, self.now_tms)
+        self.bg_displayed = self.bg.displayed
+
+    def calc_brightness(self):
+        value = BRI_STD[0]  ### day level
+        if adapt_bri:
+            ### Quantize value to mostly stop this changing with tiny light level changes
+            value += round(self.light_level / 16.0) / 16.0 * adapt_bri
+
+        ### Dim value if it's either night time or a human has not been
+        ### detected by presence sensor recently
+        if self.power.state != ACTIVE and BRI_STD[0] != BRI_STD[1]:
+            value = BRI_STD[1]  ### dim night level
+
+        return value
+
+    def update_power(self):
+        """Update the power state from the sensors, returns True if it changed."""
+        power = self.power
+        if not power.update(ticks_ms(), self.rtc_localtime[HOUR], self.light_level,
+                            self.mode_idx == CLOCK):
+            return False
+
+        if power.state >= IDLE:
+            ### micro:bit display is blanked and left alone until active again
+            self.matrix_out.clear()
+            self.matrix_out.show()
         else:
-            ### TODO This would be better if it was set once and
-            ### loop'd without wait'ing
-            display.scroll(display_char)
-    elif mode_idx == CLOCK:
-        show_display_image()
-    zip_px.show()
-
-    ### Check for button and logo presses
-    b_pressed = button_b.get_presses()
-    if b_pressed:
-        wait = False
-        if mode_idx == STOPWATCH and not clock.stopwatch_running:
-            clock.stopwatch_reset()
-            wait = True
-
-        if wait:
-            while button_b.is_pressed():
-                pass
-
-    a_pressed = button_a.get_presses()
-    if a_pressed:
-        wait = False
+            self.matrix_out.invalidate()
+        ### Dithering needs a high frame rate which idle states do not have
+        self.compositor.dither_carry = power.state < IDLE
+        self.disp_bri = self.calc_brightness()
+        return True
+
+    def wake_pending(self):
+        return self.user_input.pending() or self.power.pending()
+
+    def render_frame(self):
+        """Draw the background, hands and micro:bit display and show them,
+           returns the ms until the next frame is due."""
+        ### pylint: disable=too-many-branches,too-many-statements,too-many-locals
+        if self._held_tms is not None:
+            return self.show_held()
+
+        mode_idx = self.mode_idx
+        bg = self.bg
+        hands = self.hands
+        compositor = self.compositor
+        fade = self.fade
+        power_state = self.power.state
+        if mode_idx != STOPWATCH:
+            self.matrix_out.clear()
+        compositor.clear()
+        if _PROFILE:
+            prof.start()
+
+        rtc_localtime, rtc_utctime, ss_ms, now_tms = clock.localandutctime_with_ms_and_ticks
+        self.rtc_localtime = rtc_localtime
+        self.rtc_utctime = rtc_utctime
+        self.ss_ms = ss_ms
+        self.now_tms = now_tms
+
+        ### A frame woken just before a predicted second edge draws the
+        ### next second and holds it back to show it on the edge
+        edge_tms = self._edge_tms
+        self._edge_tms = None
+        ahead_ms = 0
+        if edge_tms is not None:
+            ahead_ms = ticks_diff(edge_tms, now_tms)
+            if not (0 < ahead_ms <= EDGE_PREPARE_MS and rtc_localtime[SECOND] == self.last_ss):
+                ahead_ms = 0
+        ### The RTC may not have ticked yet after a prepared second was shown
+        behind = self._prepared and rtc_localtime[SECOND] == (self.last_ss + 59) % 60
+        if ahead_ms or behind:
+            rtc_localtime = list(rtc_localtime)
+            DateCalc.add(rtc_localtime, 1)
+            rtc_utctime = list(rtc_utctime)
+            DateCalc.add(rtc_utctime, 1)
+            ss_ms = 0
+            if ahead_ms:
+                now_tms = edge_tms
+        self._prepared = ahead_ms > 0 or behind
+        if _PROFILE:
+            prof.mark(_P_CLOCK)
+        updates = 0
+        bg.utc_time = rtc_utctime
+        if fade.active:
+            fade.outgoing.utc_time = rtc_utctime
+            if mode_idx == CLOCK and fade.update(now_tms):
+                updates = fade.outgoing.render(rtc_localtime, ss_ms, now_tms) | HaloBackground.HALO_CHANGED
+                ### Only the incoming background is shown on the micro:bit display
+                self.matrix_out.clear()
+            else:
+                ### Leaving clock mode mid-fade ends it straight away
+                if fade.active:
+                    fade.finish()
+                self.background.release_previous()
+        if mode_idx == CLOCK and power_state != DARK:
+            render_tus = ticks_us()
+            if self.keyframes is not None and bg.KEYFRAME_MS:
+                updates |= self.keyframes.render(bg, rtc_localtime, ss_ms, now_tms)
+            else:
+                updates |= bg.render(rtc_localtime, ss_ms, now_tms)
+            ### Rendering two backgrounds would unfairly lower the quality
+            if not fade.active:
+                self.governor.update(bg, ticks_diff(ticks_us(), render_tus))
+        if _PROFILE:
+            prof.mark(_P_RENDER, type(bg).__name__ if mode_idx == CLOCK else None)
+
+        self.new_sec = rtc_localtime[SECOND] != self.last_ss
+        self.last_ss = rtc_localtime[SECOND]
+
+        ### Nothing is drawn in a dark empty room, the ZIP LEDs are sent
+        ### black once and then only the second edge is waited for
+        if power_state == DARK:
+            compositor.compose()
+            self.zip_out.show(0)
+            self.last_updates = 0
+            return 1000 - ss_ms + EDGE_MARGIN_MS + ahead_ms
+
+        hand_bri = self.hand_bri
+        if self.disp_bri != self._hand_bri_for:
+            bg.brightness = self.disp_bri
+            hand_bri[RED] = bg.z_lut[R_HAND_LUT_IDX]
+            hand_bri[GREEN] = bg.z_lut[G_HAND_LUT_IDX]
+            hand_bri[BLUE] = bg.z_lut[B_HAND_LUT_IDX]
+            compositor.dither_shift = bg.z_shift
+            self._hand_bri_for = self.disp_bri
+
+        ### Hand positions are in 1/SUBSTEPS of an LED and include the fraction
+        ### of the next unit down so they move smoothly when anti-aliased
+        h_pos = m_pos = s_pos = ms_pos = None
+        display_char = None
         if mode_idx == STOPWATCH:
-            if clock.stopwatch_running:
-                clock.stopwatch_stop()
+            time_ms = int(clock.stopwatch_time_ms())
+            hmsms = self.stopwatch_hmsms
+            hmsms[0] = time_ms // 3600000
+            hmsms[1] = time_ms // 60000 % 60
+            hmsms[2] = time_ms // 1000 % 60
+            hmsms[3] = time_ms % 1000
+            h_pos = hands.position(hmsms[0] % 12 * 60 + hmsms[1], 720)
+            m_pos = hands.position(hmsms[1] * 60 + hmsms[2], 3600)
+            s_pos = hands.position(hmsms[2] * 1000 + hmsms[3], 60_000)
+            ms_pos = hands.position(hmsms[3], 1000)
+        elif mode_idx == CLOCK:
+            ### pylint: disable=superfluous-parens
+            if not (self.bg_displayed & (1 << HOUR)):
+                h_pos = hands.position(rtc_localtime[HOUR] % 12 * 60 + rtc_localtime[MINUTE], 720)
+            if not (self.bg_displayed & (1 << MINUTE)):
+                m_pos = hands.position(rtc_localtime[MINUTE] * 60 + rtc_localtime[SECOND], 3600)
+            if not (self.bg_displayed & (1 << SECOND)):
+                s_pos = hands.position(rtc_localtime[SECOND] * 1000 + ss_ms, 60_000)
+        elif mode_idx == TIME_SET:
+            ### The value being set is shown without any fractional part
+            time_set_change = self.time_set_change
+            if time_set_change in (HOUR, MINUTE, SECOND):
+                flash_on = (now_tms % 1000) > 300.0
+                if time_set_change != HOUR or flash_on:
+                    h_pos = hands.position(rtc_localtime[HOUR] % 12, 12)
+                display_char = ("p" if rtc_localtime[HOUR] >= 12 else "a")
+                if time_set_change != MINUTE or flash_on:
+                    m_pos = hands.position(rtc_localtime[MINUTE], 60)
+                if time_set_change != SECOND or flash_on:
+                    s_pos = hands.position(rtc_localtime[SECOND], 60)
             else:
-                clock.stopwatch_start()
-            wait = True
-
-        if wait:
-            while button_a.is_pressed():
-                pass
-
-    if mode_idx == TIME_SET:
-        if b_pressed:
-            time_set_change += 1
-            if time_set_change > WEEKDAY:
-                time_set_change = YEAR
-        elif a_pressed or pin1.is_touched():
-            incrdecr = 1 if a_pressed else -1
-            base = 0
-            wrap = 60
-            if time_set_change == HOUR:
-                wrap = 24
-            elif time_set_change == YEAR:
-                base = BASE_YEAR
-            elif time_set_change == MONTH:
-                base = 1
-                wrap = 12
-            elif time_set_change == MDAY:
-                base = 1
-                wrap = DateCalc.days_in_month(rtc_localtime[MONTH], rtc_localtime[YEAR])
-            elif time_set_change == WEEKDAY:
-                wrap = 7
-
-            rtc_localtime, rtc_utctime, ss_ms, now_tms = clock.localandutctime_with_ms_and_ticks
-            ### This does not work around the DST change
-            upd_localtime = list(rtc_localtime)
-            upd_localtime[time_set_change] = (base
-                                              + (upd_localtime[time_set_change] - base + incrdecr) % wrap)
-            clock.set_rtc_local(upd_localtime)
-
-        while button_a.is_pressed() or button_b.is_pressed() or pin1.is_touched():
-            pass
-
-    if pin_logo.is_touched():
-        d_char = ""
-        new_char = ""
-        t1_ms = t2_ms = ticks_ms()
-        threshold = 1.0
-        while threshold > 0.5:
-            if mode_idx == CLOCK:
-                if ticks_diff(t2_ms, t1_ms) > VERY_LONG_DUR_MS:
-                    new_char = "t"  ### [t]ime set
-                elif ticks_diff(t2_ms, t1_ms) > LONG_DUR_MS:
-                    new_char = mode[(mode_idx + 1 ) % ROTATE_MODES][0]
-                elif ticks_diff(t2_ms, t1_ms) > SHORT_DUR_MS:
-                    new_char = "b"  ### next [b]ackground
-
-            if new_char != d_char:
+                if time_set_change == YEAR:  ### Yellow
+                    h_pos = m_pos = hands.position(rtc_localtime[YEAR] - BASE_YEAR, 60)
+                    print(rtc_localtime[YEAR])
+                    display_char = "y"
+                elif time_set_change == MONTH:  ### Magenta
+                    h_pos = s_pos = hands.position(rtc_localtime[MONTH], 60)  ### starts at 1
+                    display_char = "m"
+                elif time_set_change == MDAY:  ### Cyan
+                    m_pos = s_pos = hands.position(rtc_localtime[MDAY], 60)  ### starts at 1
+                    display_char = "d"
+                elif time_set_change == WEEKDAY:
+                    h_pos = m_pos = s_pos = hands.position(rtc_localtime[WEEKDAY], LAYOUT.rings[0][1])
+                    display_char = DAY_NAME[rtc_localtime[WEEKDAY]]
+
+        if h_pos is not None or m_pos is not None or s_pos is not None or ms_pos is not None:
+            updates |= HaloBackground.HALO_CHANGED
+        ### The hands are merged with MODE_CONTRAST which adds them to
+        ### a dim background and turns off a bright one
+        if h_pos is not None:
+            hands.draw(h_pos, RED, hand_bri[RED])
+        if m_pos is not None:
+            hands.draw(m_pos, GREEN, hand_bri[GREEN])
+        if s_pos is not None:
+            hands.draw(s_pos, BLUE, hand_bri[BLUE])
+        if ms_pos is not None:
+            hands.draw(ms_pos, RED,
+                       hand_bri[RED] * 2 if clock.stopwatch_running else hand_bri[RED] * 3 // 2)
+        if _PROFILE:
+            prof.mark(_P_HANDS)
+
+        text = self.text
+        if mode_idx == CLOCK and self.user_input.logo_hold:
+            ### Show what will happen when the logo is released
+            new_char = HOLD_CHARS[self.user_input.logo_hold]
+            if new_char != self.hold_char:
                 display.show(new_char)
-                d_char = new_char
-
-            ### This threshold is a crude form of filtering to clean up the
-            ### capacitive touch output on logo like switch debouncing
-            sleep_ms(25)
-            t2_ms = ticks_ms()
-            threshold = threshold * 0.9 + 0.1 * int(pin_logo.is_touched())
-
-        if mode_idx == TIME_SET:
-            ### Exit time set mode
-            clock.resync_enabled = True
-            clock.sync_clocks()
-            mode_idx = CLOCK
+                self.hold_char = new_char
+        elif mode_idx != STOPWATCH and power_state < IDLE:
+            if display_char is not None and display_char != text.text:
+                text.start(display_char, now_tms, loop=True)
+            updates |= text.render(now_tms)
+            if (updates | self.last_updates) & HaloBackground.MICROBIT_CHANGED:
+                ### micro:bit display is cleared each frame so only needs
+                ### checking if something was drawn now or on the last frame
+                self.matrix_out.show()
+        if _PROFILE:
+            prof.mark(_P_DISPLAY)
+        self.last_updates = updates
+        compositor.compose()
+        ### A frame drawn ahead of the edge is shown by the next call to
+        ### avoid blocking input and the other tasks while waiting
+        held = ahead_ms and ticks_diff(edge_tms, ticks_ms()) > 0
+        if held:
+            self._held_updates = updates
+        else:
+            self.zip_out.show(updates)
+            if _PROFILE and self.new_sec:
+                prof.record(_P_EDGE, ticks_diff(ticks_ms(), ticks_add(now_tms, -ss_ms)) * 1000)
+        if _PROFILE:
+            prof.mark(_P_ZIP)
+
+        ### Clock hands only need updating when the second changes
+        edge_ms = 1000 - ss_ms
+        frame_delay_ms = edge_ms + EDGE_MARGIN_MS
+        if power_state >= IDLE:
+            ### Idle only updates on the second edge
+            pass
+        elif mode_idx == CLOCK:
+            frame_delay_ms = min(frame_delay_ms, bg.frame_ms(rtc_localtime, ss_ms))
+            if fade.active:
+                frame_delay_ms = min(frame_delay_ms, FADE_FRAME_MS)
+            if s_pos is not None and hands.smooth:
+                frame_delay_ms = min(frame_delay_ms, SMOOTH_FRAME_MS)
         elif mode_idx == STOPWATCH:
-            ### Exit stopwatch mode
-            mode_idx = CLOCK
-        elif ticks_diff(t2_ms, t1_ms) < LONG_DUR_MS:
-            background_idx = (background_idx + 1) % len(background)
-            bg.stop()
-            gc.collect()
-            bg = background[background_idx]
-            bg.brightness = disp_bri
-            bg.start(rtc_localtime, ss_ms, now_tms)
-            bg_displayed = bg.displayed
-        elif ticks_diff(t2_ms, t1_ms) < VERY_LONG_DUR_MS:
-            mode_idx = (mode_idx + 1 ) % ROTATE_MODES
-            gc.collect()
+            if clock.stopwatch_running:
+                frame_delay_ms = STOPWATCH_FRAME_MS
         else:
-            mode_idx = TIME_SET
-            time_set_change = HOUR
-            clock.resync_enabled = False
+            frame_delay_ms = TIME_SET_FRAME_MS
+        if compositor.dither_shift and power_state < IDLE:
+            frame_delay_ms = min(frame_delay_ms, DITHER_FRAME_MS)
+        if self.user_input.active:
+            frame_delay_ms = min(frame_delay_ms, INPUT_POLL_MS)
+        if mode_idx != STOPWATCH and power_state < IDLE:
+            ### Scrolling text moves on its own steps rather than whenever
+            ### something else happens to need a frame
+            step_ms = self.text.next_step_ms(now_tms)
+            if step_ms is not None:
+                frame_delay_ms = min(frame_delay_ms, step_ms)
+
+        ### If the next frame would be on or after the second edge then
+        ### wake up early to prepare it instead
+        if frame_delay_ms >= edge_ms:
+            next_edge_tms = clock.next_edge_tms(now_tms, ss_ms)
+            if next_edge_tms is not None:
+                self._edge_tms = next_edge_tms
+                frame_delay_ms = max(0, edge_ms - EDGE_PREPARE_MS)
+        if held:
+            self._held_tms = edge_tms
+            self._held_delay_ms = frame_delay_ms
+            return ahead_ms
+        ### ahead_ms makes this relative to when the clock was read
+        return frame_delay_ms + ahead_ms
+
+    def show_held(self):
+        """Show the frame drawn ahead of a second edge once the edge
+           is reached, returns the ms until the next frame is due."""
+        start_tms = ticks_ms()
+        self.new_sec = False
+        wait_ms = ticks_diff(self._held_tms, start_tms)
+        if wait_ms > 0:
+            ### Woken early by input
+            return wait_ms
+        if _PROFILE:
+            prof.start()
+        self.zip_out.show(self._held_updates)
+        if _PROFILE:
+            prof.record(_P_EDGE, ticks_diff(ticks_ms(), self._held_tms) * 1000)
+            prof.mark(_P_ZIP)
+        delay_ms = ticks_diff(ticks_add(self._held_tms, self._held_delay_ms), start_tms)
+        self._held_tms = None
+        return delay_ms
+
+    def process_input(self):
+        """Act on button, logo and pin1 presses, returns the events."""
+        ### pylint: disable=too-many-branches
+        events = self.user_input.poll(ticks_ms())
+        ### A presence sensor edge is treated like input to return to the
+        ### full frame rate straight away
+        if self.power.pending() and self.update_power():
+            events |= EV_PRESENCE
+        if not events:
+            return events
+
+        mode_idx = self.mode_idx
+        if events & EV_B:
+            if mode_idx == STOPWATCH and not clock.stopwatch_running:
+                clock.stopwatch_reset()
+
+        if events & EV_A:
+            if mode_idx == STOPWATCH:
+                if clock.stopwatch_running:
+                    clock.stopwatch_stop()
+                else:
+                    clock.stopwatch_start()
 
-    ### Calculate a filtered light level to smooth/slow changes
-    if adapt_bri and new_sec:
-        light_level = display.read_light_level() * 0.125 + light_level * 0.875
-
-    ### TODO - remove
-    if new_sec:
+        if mode_idx == TIME_SET:
+            time_set_change = self.time_set_change
+            if events & EV_B:
+                time_set_change += 1
+                if time_set_change > WEEKDAY:
+                    time_set_change = YEAR
+                self.time_set_change = time_set_change
+            elif events & (EV_A | EV_PIN1):
+                incrdecr = 1 if events & EV_A else -1
+                base = 0
+                wrap = 60
+                rtc_localtime = clock.localtime_with_ms_and_ticks[0]
+                if time_set_change == HOUR:
+                    wrap = 24
+                elif time_set_change == YEAR:
+                    base = BASE_YEAR
+                elif time_set_change == MONTH:
+                    base = 1
+                    wrap = 12
+                elif time_set_change == MDAY:
+                    base = 1
+                    wrap = DateCalc.days_in_month(rtc_localtime[MONTH], rtc_localtime[YEAR])
+                elif time_set_change == WEEKDAY:
+                    wrap = 7
+
+                ### This does not work around the DST change
+                upd_localtime = list(rtc_localtime)
+                upd_localtime[time_set_change] = (base
+                                                  + (upd_localtime[time_set_change] - base + incrdecr) % wrap)
+                clock.set_rtc_local(upd_localtime)
+
+        if events & EV_LOGO:
+            self.hold_char = None
+            self.text.stop()
+            self.zip_out.invalidate()
+            self.matrix_out.invalidate()
+            self.last_updates = HaloBackground.MICROBIT_CHANGED | HaloBackground.HALO_CHANGED
+            if mode_idx == TIME_SET:
+                ### Exit time set mode
+                clock.resync_enabled = True
+                clock.sync_clocks()
+                mode_idx = CLOCK
+            elif mode_idx == STOPWATCH:
+                ### Exit stopwatch mode
+                mode_idx = CLOCK
+            elif events & EV_LOGO_SHORT:
+                self.next_background()
+            elif events & EV_LOGO_LONG:
+                mode_idx = (mode_idx + 1 ) % ROTATE_MODES
+                gc.collect()
+            else:
+                mode_idx = TIME_SET
+                self.time_set_change = HOUR
+                clock.resync_enabled = False
+        self.mode_idx = mode_idx
+        self.user_input.pin1_enabled = mode_idx == TIME_SET
+        return events
+
+    def next_background(self):
+        background = self.background
+        self.bg = None  ### the previous background can only be freed without this reference
+        bg = background.load((background.idx + 1) % len(background), self.disp_bri, keep=True)
+        self.governor.reset(bg)
+        if self.keyframes is not None:
+            self.keyframes.reset()
+        bg.start(self.rtc_localtime, self.ss_ms, self.now_tms)
+        ### The registry only keeps the previous one if there is enough memory
+        if background.previous is not None:
+            self.fade.start(background.previous, bg, self.now_tms)
+        else:
+            self.fade.show(bg)
+        self.bg = bg
+        self.bg_displayed = bg.displayed
+
+    def sense(self):
+        """Update the power state, display brightness and the light level,
+           called every second."""
+        if not self.update_power():
+            self.disp_bri = self.calc_brightness()
+
+        ### Calculate a filtered light level to smooth/slow changes,
+        ### the sensor uses the micro:bit display so is only read occasionally
+        ### when idle to see if the room has gone dark or light again
+        if adapt_bri or presence_pin:
+            self._light_s += 1
+            if self.power.state < IDLE or self._light_s >= IDLE_LIGHT_PERIOD_S:
+                self._light_s = 0
+                self.light_level = display.read_light_level() * 0.125 + self.light_level * 0.875
+
+        ### TODO - remove
         gc.collect() ; print("MF", gc.mem_free())
 
-    ### Skip communication (over radio) if not needed
-    ### Important to use UTC time here as not all timezones's hours start at same time
-    if first_comms_done and 1 <= rtc_utctime[MINUTE] < 59:
-        comms.off()
-        continue
-
-    comms.on()
-    if not first_comms_done:
-        since_start_tms = ticks_diff(now_tms, clock_start_tms)
-        first_comms_done = since_start_tms > FIRST_TX_DUR_TMS
-
-    if MASTER:
-        ### Get fresh time and broadcast it
-        rtc_utc_time, ss_ms, now_tms = clock.utctime_with_ms_and_ticks
-        if ticks_diff(now_tms, last_tx_tms) >= TX_PERIOD_TMS:
-            comms.broadcast_msg(MsgTimeWms(rtc_utc_time, ss_ms))
-            last_tx_tms = now_tms
-    else:
-        msgandhdr = comms.receive_msg_full()
-        ### Process time messsages if not recently synchronised
-        if msgandhdr is not None and ticks_diff(now_tms, last_sync_tms) > SYNC_PERIOD_TMS:
-            if isinstance(msgandhdr[0], MsgTimeWms):
-                msg, rssi, rx_tus, src, dst = msgandhdr
-                delay_us = ticks_diff(ticks_us(), rx_tus)
-                if clock.set_utctime(msg.rtc_time,
-                                     msg.ss_ms,
-                                     RADIO_TX_MS + delay_us // 1000):
-                    last_sync_tms = now_tms
+        if _PROFILE:
+            self.prof_s += 1
+            if self.prof_s >= _PROFILE_PERIOD_S or uart.any():
+                if uart.any():
+                    uart.read()
+                prof.summary()
+                zip_out = self.zip_out
+                print("PROF zip_out sent", zip_out.sent, "skipped", zip_out.skipped)
+                zip_out.sent = zip_out.skipped = 0
+                scheduler = self.scheduler
+                print("PROF frames", scheduler.frames, "early", scheduler.early)
+                scheduler.frames = scheduler.early = 0
+                print("PROF quality", self.bg.quality, "changes", self.governor.changes)
+                self.governor.changes = 0
+                self.prof_s = 0
+
+    def communicate(self):
+        """Broadcast or listen for the time over radio near the hour,
+           returns the ms until this is next needed."""
+        rtc_utctime = self.rtc_utctime
+        ### Important to use UTC time here as not all timezones's hours start at same time
+        if self.first_comms_done and 1 <= rtc_utctime[MINUTE] < 59:
+            comms.off()
+            return ((59 - rtc_utctime[MINUTE]) * 60 - rtc_utctime[SECOND]) * 1000 - self.ss_ms
+
+        comms.on()
+        now_tms = self.now_tms
+        if not self.first_comms_done:
+            since_start_tms = ticks_diff(now_tms, self.clock_start_tms)
+            self.first_comms_done = since_start_tms > FIRST_TX_DUR_TMS
+
+        if MASTER:
+            ### Get fresh time and broadcast it
+            rtc_utctime, ss_ms, now_tms = clock.utctime_with_ms_and_ticks
+            if ticks_diff(now_tms, self.last_tx_tms) >= TX_PERIOD_TMS:
+                comms.broadcast_msg(MsgTimeWms(rtc_utctime, ss_ms))
+                self.last_tx_tms = now_tms
+        else:
+            msgandhdr = comms.receive_msg_full()
+            ### Process time messsages if not recently synchronised
+            if msgandhdr is not None and ticks_diff(now_tms, self.last_sync_tms) > SYNC_PERIOD_TMS:
+                if isinstance(msgandhdr[0], MsgTimeWms):
+                    msg, rssi, rx_tus, src, dst = msgandhdr
+                    delay_us = ticks_diff(ticks_us(), rx_tus)
+                    if clock.set_utctime(msg.rtc_time,
+                                         msg.ss_ms,
+                                         RADIO_TX_MS + delay_us // 1000):
+                        self.last_sync_tms = now_tms
+        return RADIO_POLL_MS
+
+    def run(self):
+        if ClockTasks is not None:
+            ### Each stage becomes a task running at its own rate, this does not return
+            ClockTasks(self.render_frame, self.process_input, self.sense, self.communicate,
+                       input_ms=INPUT_POLL_MS).run()
+
+        scheduler = self.scheduler
+        wake_pending = self.wake_pending
+        while True:
+            ### Sleep until next frame is due or there's some input
+            scheduler.wait(wake_pending)
+
+            ### The frame delay is relative to the start of render_frame()
+            frame_start_tms = ticks_ms()
+            frame_delay_ms = self.render_frame()
+            if self.process_input():
+                frame_delay_ms = 0  ### show the result of the input straight away
+            if _PROFILE:
+                prof.mark(_P_INPUT)
+
+            if self.new_sec:
+                self.sense()
+            if _PROFILE:
+                prof.mark(_P_MISC)
+
+            frame_delay_ms = min(frame_delay_ms, self.communicate())
+            if _PROFILE:
+                prof.mark(_P_COMMS)
+            scheduler.next_frame(frame_start_tms, frame_delay_ms)
+
+
+app = ClockApp(zip_px)
+gc.collect()
+app.run()